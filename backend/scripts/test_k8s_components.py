@@ -15,12 +15,11 @@ Usage:
 """
 
 import asyncio
-import os
-import sys
-import uuid
+import secrets
+from contextlib import aclosing
 
-# Add src to path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+# How long to watch a new job before giving up on it starting
+JOB_START_TIMEOUT_SECONDS = 30
 
 
 async def test_namespace():
@@ -32,7 +31,7 @@ async def test_namespace():
         setup_worker_rbac,
     )
 
-    task_id = f"test-{uuid.uuid4().hex[:8]}"
+    task_id = f"test-{secrets.token_hex(4)}"
 
     print(f"Testing with task_id: {task_id}")
     print()
@@ -46,45 +45,59 @@ async def test_namespace():
         print(f"   ✗ Failed: {e}")
         return
 
-    # Test 2: Copy secrets
-    print("2. Copying secrets...")
-    try:
-        await copy_secrets_to_namespace(task_id, namespace)
+    # Tests 2+3: Copy secrets and setup worker RBAC (independent, run concurrently)
+    print("2. Copying secrets + 3. Setting up worker RBAC...")
+    secrets_result, rbac_result = await asyncio.gather(
+        copy_secrets_to_namespace(task_id, namespace),
+        setup_worker_rbac(task_id, namespace),
+        return_exceptions=True,
+    )
+    if isinstance(secrets_result, Exception):
+        print(f"   ✗ Secrets failed: {secrets_result}")
+    else:
         print("   ✓ Secrets copied")
-    except Exception as e:
-        print(f"   ✗ Failed: {e}")
-
-    # Test 3: Setup worker RBAC
-    print("3. Setting up worker RBAC...")
-    try:
-        await setup_worker_rbac(task_id, namespace)
+    if isinstance(rbac_result, Exception):
+        print(f"   ✗ Worker RBAC failed: {rbac_result}")
+    else:
         print("   ✓ Worker RBAC configured")
-    except Exception as e:
-        print(f"   ✗ Failed: {e}")
 
-    # Test 4: Verify namespace exists
-    print("4. Verifying namespace...")
-    from mainloop.services.k8s_namespace import get_k8s_client
+    # Tests 4+5: Verify namespace and list secrets (independent reads)
+    print("4. Verifying namespace + 5. Checking secrets...")
+    from mainloop.services.k8s_namespace import get_api_client, get_k8s_client
 
     core_v1, _ = get_k8s_client()
-    try:
-        ns = core_v1.read_namespace(namespace)
+    ns, namespace_secrets = await asyncio.gather(
+        asyncio.to_thread(core_v1.read_namespace, namespace),
+        asyncio.to_thread(
+            get_api_client().call_api,
+            f"/api/v1/namespaces/{namespace}/secrets",
+            "GET",
+            query_params=[
+                # Let the apiserver drop service account tokens and serve from
+                # its watch cache instead of returning every secret
+                ("fieldSelector", "type!=kubernetes.io/service-account-token"),
+                ("resourceVersion", "0"),
+            ],
+            # Only names are needed, so ask for metadata instead of full
+            # secrets (the Python client can't decode protobuf)
+            header_params={
+                "Accept": "application/json;as=PartialObjectMetadataList;g=meta.k8s.io;v=v1"
+            },
+            auth_settings=["BearerToken"],
+            response_type="object",
+            _return_http_data_only=True,
+        ),
+        return_exceptions=True,
+    )
+    if isinstance(ns, Exception):
+        print(f"   ✗ Namespace check failed: {ns}")
+    else:
         print(f"   ✓ Namespace exists with status: {ns.status.phase}")
-    except Exception as e:
-        print(f"   ✗ Failed: {e}")
-
-    # Test 5: List secrets in namespace
-    print("5. Checking secrets...")
-    try:
-        secrets = core_v1.list_namespaced_secret(namespace)
-        secret_names = [
-            s.metadata.name
-            for s in secrets.items
-            if not s.metadata.name.startswith("default")
-        ]
+    if isinstance(namespace_secrets, Exception):
+        print(f"   ✗ Secrets check failed: {namespace_secrets}")
+    else:
+        secret_names = [s["metadata"]["name"] for s in namespace_secrets["items"]]
         print(f"   ✓ Found secrets: {secret_names}")
-    except Exception as e:
-        print(f"   ✗ Failed: {e}")
 
     # Test 6: Delete namespace
     print("6. Deleting namespace...")
@@ -100,10 +113,7 @@ async def test_namespace():
 
 async def test_job():
     """Test job creation in a namespace."""
-    from mainloop.services.k8s_jobs import (
-        create_worker_job,
-        get_job_status,
-    )
+    from mainloop.services.k8s_jobs import create_worker_job, watch_job_until_terminal
     from mainloop.services.k8s_namespace import (
         copy_secrets_to_namespace,
         create_task_namespace,
@@ -111,7 +121,7 @@ async def test_job():
         setup_worker_rbac,
     )
 
-    task_id = f"test-{uuid.uuid4().hex[:8]}"
+    task_id = f"test-{secrets.token_hex(4)}"
 
     print(f"Testing job with task_id: {task_id}")
     print()
@@ -119,8 +129,10 @@ async def test_job():
     # Setup namespace
     print("1. Setting up namespace...")
     namespace = await create_task_namespace(task_id)
-    await copy_secrets_to_namespace(task_id, namespace)
-    await setup_worker_rbac(task_id, namespace)
+    await asyncio.gather(
+        copy_secrets_to_namespace(task_id, namespace),
+        setup_worker_rbac(task_id, namespace),
+    )
     print(f"   ✓ Namespace ready: {namespace}")
 
     # Create job
@@ -139,17 +151,22 @@ async def test_job():
         await delete_task_namespace(task_id)
         return
 
-    # Wait a bit and check status
+    # Watch the job until it starts (or finishes) instead of sleeping
     print("3. Waiting for job to start...")
-    await asyncio.sleep(5)
-
-    status = await get_job_status(task_id, namespace)
-    if status:
+    started = None
+    async with aclosing(
+        watch_job_until_terminal(task_id, namespace, JOB_START_TIMEOUT_SECONDS)
+    ) as statuses:
+        async for status in statuses:
+            if status["active"] or status["succeeded"] or status["failed"]:
+                started = status
+                break
+    if started:
         print(
-            f"   Active: {status['active']}, Succeeded: {status['succeeded']}, Failed: {status['failed']}"
+            f"   Active: {started['active']}, Succeeded: {started['succeeded']}, Failed: {started['failed']}"
         )
     else:
-        print("   No status yet")
+        print(f"   No status after {JOB_START_TIMEOUT_SECONDS}s")
 
     # Show how to watch
     print()
@@ -169,6 +186,11 @@ async def main():
     parser.add_argument("--job", action="store_true", help="Test job creation (slower)")
     args = parser.parse_args()
 
+    # Load config and open the connection pool before any timed steps
+    from mainloop.services.k8s_namespace import get_api_client
+
+    get_api_client()
+
     if args.job:
         await test_job()
     else:
@@ -176,4 +198,6 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    import uvloop
+
+    asyncio.run(main(), loop_factory=uvloop.new_event_loop)
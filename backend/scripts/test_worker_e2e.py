@@ -19,18 +19,9 @@ Usage:
 
 import asyncio
 import os
-import sys
+import secrets
 import uuid
 
-# Add src to path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
-
-from dbos import DBOS, SetWorkflowID
-from mainloop.db import db
-from mainloop.workflows.dbos_config import dbos_config  # noqa: F401
-
-from models import TaskStatus, WorkerTask
-
 # Test configuration
 TEST_REPO_URL = os.environ.get("REPO_URL", "https://github.com/oldsj/mainloop")
 TEST_TASK_DESCRIPTION = os.environ.get(
@@ -41,6 +32,13 @@ TEST_TASK_DESCRIPTION = os.environ.get(
 
 async def run_test():
     """Run the E2E test."""
+    from dbos import DBOS, SetWorkflowID
+    from mainloop.db import db
+    from mainloop.workflows.dbos_config import dbos_config  # noqa: F401
+    from mainloop.workflows.worker import worker_task_workflow
+
+    from models import MainThread, TaskStatus, WorkerTask
+
     print("=" * 60)
     print("Worker Task E2E Test")
     print("=" * 60)
@@ -56,12 +54,8 @@ async def run_test():
     DBOS.launch()
 
     # Create a test main thread first (required for FK)
-    from models import MainThread
-
-    test_user_id = f"test-user-{uuid.uuid4().hex[:8]}"
+    test_user_id = f"test-user-{secrets.token_hex(4)}"
     main_thread = MainThread(user_id=test_user_id, workflow_run_id="test-workflow")
-    main_thread = await db.create_main_thread(main_thread)
-    print(f"Created main thread: {main_thread.id}")
 
     # Create a test task
     task_id = str(uuid.uuid4())
@@ -76,13 +70,12 @@ async def run_test():
         status=TaskStatus.PENDING,
     )
 
-    # Save task to database
-    task = await db.create_worker_task(task)
+    # Save thread + task to database in one transaction
+    main_thread, task = await db.create_thread_and_task(main_thread, task)
+    print(f"Created main thread: {main_thread.id}")
     print(f"Created task: {task.id}")
 
-    # Import and start the workflow
-    from mainloop.workflows.worker import worker_task_workflow
-
+    # Start the workflow
     print("Starting worker workflow...")
     print()
     print("Watch the workflow with:")
@@ -107,4 +100,6 @@ async def run_test():
 
 
 if __name__ == "__main__":
-    asyncio.run(run_test())
+    import uvloop
+
+    asyncio.run(run_test(), loop_factory=uvloop.new_event_loop)
@@ -1,11 +1,20 @@
 """FastAPI application with DBOS durable workflows."""
 
-from datetime import datetime
+import asyncio
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from typing import Any
+from uuid import uuid4
 
-from dbos import DBOS
-from fastapi import FastAPI, Header, HTTPException, Request
+import orjson
+from dbos import DBOS, SetWorkflowID
+from dbos import error as dbos_error
+from fastapi import FastAPI, Header, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+from mainloop.background import drain_background_tasks
 from mainloop.config import settings
 from mainloop.db import db
 from mainloop.models import (
@@ -15,31 +24,53 @@ from mainloop.models import (
     ConversationResponse,
 )
 from mainloop.services.chat_handler import process_message
+from mainloop.services.claude_agent import close_claude_agent_client
+from mainloop.services.compaction import trigger_compaction
 from mainloop.services.github_pr import (
     CommitSummary,
     ProjectPRSummary,
     add_issue_comment,
+    close_github,
     get_repo_metadata,
     list_open_prs,
     list_recent_commits,
     update_github_issue,
 )
+from mainloop.services.job_results import record_job_result
+from mainloop.services.k8s_jobs import get_job_logs
+from mainloop.services.k8s_namespace import (
+    delete_task_namespace,
+    list_task_jobs,
+    namespace_exists,
+    start_informers,
+    stop_informers,
+)
 from mainloop.sse import (
     create_sse_response,
+    dispatch_task_update,
     event_stream,
     notify_inbox_updated,
-    notify_task_updated,
+    resync_task_updates,
+    schedule_inbox_refresh,
     task_log_stream,
+    task_status_stream,
 )
 
 # Import DBOS config to initialize DBOS before defining workflows
-from mainloop.workflows.dbos_config import dbos_config  # noqa: F401
+from mainloop.workflows.dbos_config import dbos_config, worker_queue  # noqa: F401
 
 # Import workflows so they are registered with DBOS
 from mainloop.workflows.main_thread import (
+    TOPIC_QUEUE_RESPONSE,
     get_or_start_main_thread,
 )
-from mainloop.workflows.worker import worker_task_workflow  # noqa: F401
+from mainloop.workflows.worker import (  # noqa: F401
+    TOPIC_JOB_RESULT,
+    TOPIC_PLAN_RESPONSE,
+    TOPIC_QUESTION_RESPONSE,
+    TOPIC_START_IMPLEMENTATION,
+    worker_task_workflow,
+)
 from pydantic import BaseModel
 
 from models import (
@@ -51,11 +82,15 @@ from models import (
     TaskStatus,
     WorkerTask,
 )
+from models.workflow import QuestionOption, TaskQuestion
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI(
     title="Mainloop API",
     description="AI agent orchestrator API with durable workflows",
     version="0.2.0",
+    default_response_class=ORJSONResponse,
 )
 
 # CORS middleware
@@ -64,8 +99,14 @@ app.add_middleware(
     allow_origin_regex=r"http://localhost:\d+",  # All localhost ports
     allow_origins=[settings.frontend_origin],  # Production
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "DELETE"],
+    allow_headers=[
+        "Authorization",
+        "Content-Type",
+        "X-User-ID",
+        "Cf-Access-Jwt-Assertion",
+    ],
+    max_age=7200,  # Let browsers cache preflights (Chromium's upper limit)
 )
 
 
@@ -99,7 +140,7 @@ def _apply_mock_github():
         if hasattr(github_mock, name):
             setattr(github_pr, name, getattr(github_mock, name))
 
-    print("[startup] GitHub mock enabled - API calls will be simulated")
+    logger.info("GitHub mock enabled - API calls will be simulated")
 
 
 @app.on_event("startup")
@@ -108,17 +149,37 @@ async def startup_event():
     # Apply mocks before anything else
     _apply_mock_github()
 
+    # Size the pool behind asyncio.to_thread for long K8s watches instead of
+    # the min(32, cpu_count + 4) default
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(
+            max_workers=settings.thread_pool_size, thread_name_prefix="mainloop-io"
+        )
+    )
+
     # Connect to PostgreSQL
     await db.connect()
     await db.ensure_tables_exist()
+    await db.listen_task_updates(dispatch_task_update, resync_task_updates)
 
     # Launch DBOS
     DBOS.launch()
 
+    # Index task namespaces and jobs so debug views don't hit the K8s API
+    start_informers()
+
+    # Run new tasks eagerly: short coroutines (e.g. SSE notifiers with no
+    # connected clients) finish without a trip through the loop's ready queue
+    asyncio.get_running_loop().set_task_factory(asyncio.eager_task_factory)
+
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Clean up on shutdown."""
+    stop_informers()
+    await drain_background_tasks()
+    await close_github()
+    await close_claude_agent_client()
     await db.disconnect()
 
 
@@ -142,12 +203,22 @@ async def health():
     return {"status": "healthy", "dbos": "active"}
 
 
+@app.get("/health/ready")
+async def health_ready():
+    """Readiness check: verifies the database pool can serve queries."""
+    try:
+        pool = await db.health_check()
+    except Exception as e:
+        logger.warning(f"Readiness check failed: {e}")
+        raise HTTPException(status_code=503, detail="Database unavailable") from e
+    return {"status": "ready", "pool": pool}
+
+
 # ============= SSE Endpoints =============
 
 
 @app.get("/events")
 async def sse_events(
-    request: Request,
     user_id: str = Header(alias="X-User-ID", default=None),
     user_id_query: str | None = None,
 ):
@@ -167,13 +238,12 @@ async def sse_events(
         else:
             user_id = get_user_id_from_cf_header()
 
-    return create_sse_response(event_stream(user_id, request))
+    return create_sse_response(event_stream(user_id))
 
 
 @app.get("/tasks/{task_id}/logs/stream")
 async def sse_task_logs(
     task_id: str,
-    request: Request,
     user_id: str = Header(alias="X-User-ID", default=None),
 ):
     """SSE endpoint for streaming task logs.
@@ -195,7 +265,34 @@ async def sse_task_logs(
     if task.user_id != user_id:
         raise HTTPException(status_code=403, detail="Not your task")
 
-    return create_sse_response(task_log_stream(task_id, user_id, request))
+    return create_sse_response(task_log_stream(task_id, user_id))
+
+
+@app.get("/tasks/{task_id}/events")
+async def sse_task_events(
+    task_id: str,
+    user_id: str = Header(alias="X-User-ID", default=None),
+):
+    """SSE endpoint for task status transitions.
+
+    Streams events for:
+    - status - the current status, then each change as it is written
+    - end - stream is ending (task reached a terminal status)
+
+    Changes are pushed via Postgres LISTEN/NOTIFY, so status updates from
+    workflows arrive without polling.
+    """
+    if not user_id:
+        user_id = get_user_id_from_cf_header()
+
+    # Verify task exists and belongs to user
+    task = await db.get_worker_task(task_id)
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    if task.user_id != user_id:
+        raise HTTPException(status_code=403, detail="Not your task")
+
+    return create_sse_response(task_status_stream(task_id, user_id))
 
 
 # ============= Main Thread Endpoints =============
@@ -234,52 +331,55 @@ async def get_thread(thread_id: str):
 # ============= Chat Endpoints =============
 
 
+async def _get_main_thread_id(user_id: str, workflow_id: str) -> str:
+    """Get the user's main thread record ID, creating the record if missing."""
+    if thread_id := await db.get_main_thread_id(user_id):
+        return thread_id
+
+    # Create main thread record if it doesn't exist (e.g., after DB reset)
+    thread = await db.create_main_thread(
+        MainThread(user_id=user_id, workflow_run_id=workflow_id)
+    )
+    return thread.id
+
+
 @app.post("/chat", response_model=ChatResponse)
 async def chat(
     request: ChatRequest,
     user_id: str = Header(alias="X-User-ID", default=None),
 ):
     """Send a message and get an immediate response."""
-    from mainloop.services.compaction import trigger_compaction
-
     if not user_id:
         user_id = get_user_id_from_cf_header()
 
     # Ensure main thread is running (for background coordination)
     main_thread_id = get_or_start_main_thread(user_id)
 
-    # Get or create conversation
+    # Load the conversation and its context (summary + recent messages after
+    # the last summarized point) in parallel. Context must be read before the
+    # new user message is saved.
     if request.conversation_id:
-        conversation = await db.get_conversation(request.conversation_id)
+        conversation, recent_messages = await asyncio.gather(
+            db.get_conversation(request.conversation_id),
+            db.get_unsummarized_messages(request.conversation_id, limit=20),
+        )
         if not conversation:
             raise HTTPException(status_code=404, detail="Conversation not found")
+        # Only once the conversation exists, since this may create a record
+        thread_id = await _get_main_thread_id(user_id, main_thread_id)
     else:
-        conversation = await db.create_conversation(user_id)
-
-    # Load context: summary + recent messages after last summarized point
-    recent_messages = await db.get_messages_after(
-        conversation.id,
-        conversation.summarized_through_id,
-        limit=20,
-    )
+        conversation, thread_id = await asyncio.gather(
+            db.create_conversation(user_id),
+            _get_main_thread_id(user_id, main_thread_id),
+        )
+        recent_messages = []
 
-    # Save user message and increment count
+    # Save user message
     await db.create_message(
         conversation_id=conversation.id,
         role="user",
         content=request.message,
     )
-    await db.increment_message_count(conversation.id)
-
-    # Get or create main thread record
-    main_thread = await db.get_main_thread_by_user(user_id)
-    if not main_thread:
-        # Create main thread record if it doesn't exist (e.g., after DB reset)
-        from models import MainThread
-
-        main_thread = MainThread(user_id=user_id, workflow_run_id=main_thread_id)
-        main_thread = await db.create_main_thread(main_thread)
-    thread_id = main_thread.id
 
     # Process message with summary + recent messages for context
     result = await process_message(
@@ -291,16 +391,15 @@ async def chat(
         recent_messages=recent_messages,
     )
 
-    # Save assistant response and increment count
-    assistant_message = await db.create_message(
+    # Save assistant response
+    assistant_message, unsummarized_count = await db.create_message(
         conversation_id=conversation.id,
         role="assistant",
         content=result.response,
     )
-    new_count = await db.increment_message_count(conversation.id)
 
     # Trigger async compaction if needed (fire-and-forget)
-    trigger_compaction(conversation.id, new_count)
+    trigger_compaction(conversation.id, unsummarized_count)
 
     return ChatResponse(
         conversation_id=conversation.id,
@@ -327,12 +426,25 @@ async def list_conversations(
 
 
 @app.get("/conversations/{conversation_id}", response_model=ConversationResponse)
-async def get_conversation(conversation_id: str):
-    """Get a conversation with its messages."""
+async def get_conversation(
+    conversation_id: str,
+    response: Response,
+    if_none_match: str | None = Header(default=None),
+):
+    """Get a conversation with its messages.
+
+    Returns 304 without loading messages if the client's ETag is current.
+    """
     conversation = await db.get_conversation(conversation_id)
     if not conversation:
         raise HTTPException(status_code=404, detail="Conversation not found")
 
+    # Every new message and compaction bumps updated_at
+    etag = f'W/"{conversation.updated_at.isoformat()}-{conversation.message_count}"'
+    if if_none_match == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+
     messages = await db.get_messages(conversation_id)
     return ConversationResponse(
         conversation=conversation,
@@ -417,8 +529,7 @@ async def mark_queue_item_read(
     await db.mark_queue_item_read(item_id)
 
     # Notify SSE clients of unread count change
-    unread_count = await db.count_unread_queue_items(user_id)
-    await notify_inbox_updated(user_id, item_id=item_id, unread_count=unread_count)
+    schedule_inbox_refresh(user_id, item_id)
 
     return {"status": "ok"}
 
@@ -456,31 +567,30 @@ async def respond_to_queue_item(
     if item.user_id != user_id:
         raise HTTPException(status_code=403, detail="Not your queue item")
 
-    # Mark as read when responding
-    await db.mark_queue_item_read(item_id)
+    async def mark_read_and_notify():
+        # Mark as read when responding, then notify SSE clients
+        await db.mark_queue_item_read(item_id)
+        schedule_inbox_refresh(user_id, item_id)
 
     # Send response to the main thread workflow with full context
-    from mainloop.workflows.main_thread import TOPIC_QUEUE_RESPONSE
-
     main_thread_workflow_id = f"main-thread-{user_id}"
-    DBOS.send(
-        main_thread_workflow_id,
-        {
-            "type": TOPIC_QUEUE_RESPONSE,
-            "payload": {
-                "queue_item_id": item_id,
-                "response": response.response,
-                "task_id": item.task_id,
-                "context": item.context,
-                "item_type": item.item_type.value if item.item_type else None,
+    await asyncio.gather(
+        DBOS.send_async(
+            main_thread_workflow_id,
+            {
+                "type": TOPIC_QUEUE_RESPONSE,
+                "payload": {
+                    "queue_item_id": item_id,
+                    "response": response.response,
+                    "task_id": item.task_id,
+                    "context": item.context,
+                    "item_type": item.item_type.value if item.item_type else None,
+                },
             },
-        },
+        ),
+        mark_read_and_notify(),
     )
 
-    # Notify SSE clients
-    unread_count = await db.count_unread_queue_items(user_id)
-    await notify_inbox_updated(user_id, item_id=item_id, unread_count=unread_count)
-
     return {"status": "ok", "message": "Response sent"}
 
 
@@ -531,15 +641,13 @@ async def get_project_detail(
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
-    # Fetch GitHub data in parallel
-    open_prs = await list_open_prs(project.html_url, limit=10)
-    recent_commits = await list_recent_commits(
-        project.html_url, branch=project.default_branch, limit=10
+    # Fetch GitHub data and tasks for this project in parallel
+    open_prs, recent_commits, tasks = await asyncio.gather(
+        list_open_prs(project.html_url, limit=10),
+        list_recent_commits(project.html_url, branch=project.default_branch, limit=10),
+        db.list_worker_tasks(user_id=user_id, project_id=project_id, limit=50),
     )
 
-    # Fetch tasks for this project
-    tasks = await db.list_worker_tasks(user_id=user_id, project_id=project_id, limit=50)
-
     return ProjectDetail(
         project=project,
         open_prs=open_prs,
@@ -662,30 +770,19 @@ async def get_task_logs(
         raise HTTPException(status_code=403, detail="Not your task")
 
     # Try to get live logs from K8s
-    import logging
-
-    from mainloop.services.k8s_jobs import get_job_logs
-
-    logger = logging.getLogger(__name__)
     namespace = f"task-{task_id[:8]}"
 
     logs = None
     source = "k8s"
 
     try:
-        logs = await get_job_logs(task_id, namespace)
+        logs = await get_job_logs(task_id, namespace, tail_lines=tail)
     except Exception as e:
         logger.warning(f"Failed to get K8s logs for task {task_id}: {e}")
 
     if not logs:
         logs = ""
         source = "none"
-    else:
-        # Tail the logs to requested number of lines
-        lines = logs.split("\n")
-        if len(lines) > tail:
-            lines = lines[-tail:]
-        logs = "\n".join(lines)
 
     return TaskLogsResponse(
         logs=logs,
@@ -710,31 +807,38 @@ async def cancel_task(
     if task.user_id != user_id:
         raise HTTPException(status_code=403, detail="Not your task")
 
-    # Cancel the DBOS workflow
-    DBOS.cancel_workflow(task_id)
+    async def cancel_workflow():
+        # Cancel the DBOS workflow before recording the status, so it can't
+        # overwrite it
+        await DBOS.cancel_workflow_async(task_id)
+        await _set_task_status(task_id, TaskStatus.CANCELLED)
 
-    await db.update_worker_task(task_id, status=TaskStatus.CANCELLED)
+    ops = [cancel_workflow()]
 
     # Close GitHub issue if exists
     if task.repo_url and task.issue_number:
-        await add_issue_comment(
-            task.repo_url, task.issue_number, "❌ Task cancelled by user."
-        )
-        await update_github_issue(task.repo_url, task.issue_number, state="closed")
+        ops.append(_close_cancelled_issue(task.repo_url, task.issue_number))
 
     # Close GitHub PR if exists (PRs are also issues in GitHub API)
     if task.repo_url and task.pr_number and task.pr_number != task.issue_number:
-        await add_issue_comment(
-            task.repo_url, task.pr_number, "❌ Task cancelled by user."
-        )
-        await update_github_issue(task.repo_url, task.pr_number, state="closed")
+        ops.append(_close_cancelled_issue(task.repo_url, task.pr_number))
 
-    # Notify SSE clients
-    await notify_task_updated(user_id, task_id, "cancelled")
+    await asyncio.gather(*ops)
 
     return {"status": "cancelled"}
 
 
+async def _set_task_status(task_id: str, status: TaskStatus, **fields):
+    """Update a task's status (SSE clients are notified by the database)."""
+    await db.update_worker_task(task_id, status=status, **fields)
+
+
+async def _close_cancelled_issue(repo_url: str, number: int):
+    """Comment on and close the GitHub issue or PR of a cancelled task."""
+    await add_issue_comment(repo_url, number, "❌ Task cancelled by user.")
+    await update_github_issue(repo_url, number, state="closed")
+
+
 class AnswerQuestionsRequest(BaseModel):
     """Request to answer task questions."""
 
@@ -770,13 +874,10 @@ async def answer_task_questions(
             detail=f"Task is not waiting for questions (status: {task.status})",
         )
 
-    # Send answers to the worker workflow
-    from dbos import error as dbos_error
-    from mainloop.workflows.worker import TOPIC_QUESTION_RESPONSE
-
-    # Try to send to worker workflow, but continue if workflow doesn't exist (e.g., in tests)
+    # Send answers to the worker workflow before any side effects, so a failed
+    # send leaves the task as it was
     try:
-        DBOS.send(
+        await DBOS.send_async(
             task_id,  # Worker workflow ID is the task ID
             {
                 "action": body.action,
@@ -790,22 +891,18 @@ async def answer_task_questions(
 
     # Update task status immediately so frontend sees correct state on refetch
     # The workflow will also update this, but we do it here to prevent race conditions
+    ops = []
     if body.action == "cancel":
-        await db.update_worker_task(
-            task_id, status=TaskStatus.CANCELLED, pending_questions=[]
+        ops.append(
+            _set_task_status(task_id, TaskStatus.CANCELLED, pending_questions=[])
         )
         # Close GitHub issue if exists
         if task.repo_url and task.issue_number:
-            await add_issue_comment(
-                task.repo_url, task.issue_number, "❌ Task cancelled by user."
-            )
-            await update_github_issue(task.repo_url, task.issue_number, state="closed")
-        await notify_task_updated(user_id, task_id, "cancelled")
+            ops.append(_close_cancelled_issue(task.repo_url, task.issue_number))
     else:
-        await db.update_worker_task(
-            task_id, status=TaskStatus.PLANNING, pending_questions=[]
-        )
-        await notify_task_updated(user_id, task_id, "planning")
+        ops.append(_set_task_status(task_id, TaskStatus.PLANNING, pending_questions=[]))
+
+    await asyncio.gather(*ops)
 
     return {"status": "ok", "message": f"Sent {len(body.answers)} answer(s) to task"}
 
@@ -837,10 +934,9 @@ async def approve_task_plan(
             detail=f"Task is not waiting for plan review (status: {task.status})",
         )
 
-    # Send response to the worker workflow
-    from mainloop.workflows.worker import TOPIC_PLAN_RESPONSE
-
-    DBOS.send(
+    # Send response to the worker workflow before any side effects, so a
+    # failed send leaves the task as it was
+    await DBOS.send_async(
         task_id,
         {
             "action": action,  # "approve", "cancel", or revision text
@@ -850,24 +946,19 @@ async def approve_task_plan(
     )
 
     # Update task status immediately so frontend sees correct state on refetch
+    ops = []
     if action == "cancel":
-        await db.update_worker_task(
-            task_id, status=TaskStatus.CANCELLED, plan_text=None
-        )
+        ops.append(_set_task_status(task_id, TaskStatus.CANCELLED, plan_text=None))
         # Close GitHub issue if exists
         if task.repo_url and task.issue_number:
-            await add_issue_comment(
-                task.repo_url, task.issue_number, "❌ Task cancelled by user."
-            )
-            await update_github_issue(task.repo_url, task.issue_number, state="closed")
-        await notify_task_updated(user_id, task_id, "cancelled")
+            ops.append(_close_cancelled_issue(task.repo_url, task.issue_number))
     elif action == "approve":
-        await db.update_worker_task(task_id, status=TaskStatus.READY_TO_IMPLEMENT)
-        await notify_task_updated(user_id, task_id, "ready_to_implement")
+        ops.append(_set_task_status(task_id, TaskStatus.READY_TO_IMPLEMENT))
     else:
         # Revision - back to planning
-        await db.update_worker_task(task_id, status=TaskStatus.PLANNING)
-        await notify_task_updated(user_id, task_id, "planning")
+        ops.append(_set_task_status(task_id, TaskStatus.PLANNING))
+
+    await asyncio.gather(*ops)
 
     return {"status": "ok", "action": action}
 
@@ -898,19 +989,14 @@ async def start_task_implementation(
         )
 
     # Send implementation trigger to the worker workflow
-    from mainloop.workflows.worker import TOPIC_START_IMPLEMENTATION
-
-    DBOS.send(
+    await DBOS.send_async(
         task_id,
         {"action": "start"},
         topic=TOPIC_START_IMPLEMENTATION,
     )
 
     # Update task status immediately so frontend sees correct state on refetch
-    await db.update_worker_task(task_id, status=TaskStatus.IMPLEMENTING)
-
-    # Notify SSE clients
-    await notify_task_updated(user_id, task_id, "implementing")
+    await _set_task_status(task_id, TaskStatus.IMPLEMENTING)
 
     return {"status": "ok", "message": "Implementation started"}
 
@@ -918,6 +1004,10 @@ async def start_task_implementation(
 # ============= Internal Endpoints (for K8s Jobs) =============
 
 
+# Number at the end of a GitHub issue or PR URL
+_TRAILING_NUMBER = re.compile(r"/(\d+)/?$")
+
+
 class TaskResult(BaseModel):
     """Result from a worker Job."""
 
@@ -934,65 +1024,56 @@ async def task_complete(task_id: str, result: TaskResult):
 
     This is called by the job_runner when a worker Job finishes.
     It updates the task status and notifies the main thread workflow.
+    Results are stored in batches with concurrent callbacks.
     """
-    # Verify task exists
-    task = await db.get_worker_task(task_id)
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
-
     # Update task with job result
     # NOTE: "completed" here means the K8s job finished, NOT that the task is done.
     # The task is only truly completed when the PR is merged (handled by workflow).
     # We just store the URL/number here without changing status.
+    fields: dict[str, Any] = {}
     if result.status == "completed":
         # Handle both issue URLs (plan phase) and PR URLs (implement phase)
-        issue_url = result.result.get("issue_url") if result.result else None
-        pr_url = result.result.get("pr_url") if result.result else None
+        payload = result.result or {}
+        issue_url = payload.get("issue_url")
+        pr_url = payload.get("pr_url")
         issue_number = None
         pr_number = None
 
         if issue_url:
             # Extract issue number from URL (e.g., https://github.com/owner/repo/issues/123)
-            try:
-                issue_number = int(issue_url.split("/")[-1])
-            except (ValueError, IndexError):
-                pass
+            if m := _TRAILING_NUMBER.search(issue_url):
+                issue_number = int(m.group(1))
 
         if pr_url:
             # Extract PR number from URL (e.g., https://github.com/owner/repo/pull/123)
-            try:
-                pr_number = int(pr_url.split("/")[-1])
-            except (ValueError, IndexError):
-                pass
+            if m := _TRAILING_NUMBER.search(pr_url):
+                pr_number = int(m.group(1))
 
         # Update task with URLs - don't mark COMPLETED, workflow manages status
         if issue_url or pr_url:
-            await db.update_worker_task(
-                task_id,
-                result=result.result,
-                issue_url=issue_url,
-                issue_number=issue_number,
-                pr_url=pr_url,
-                pr_number=pr_number,
-            )
+            fields = {
+                "result": result.result,
+                "issue_url": issue_url,
+                "issue_number": issue_number,
+                "pr_url": pr_url,
+                "pr_number": pr_number,
+            }
     elif result.status == "failed":
-        await db.update_worker_task(
-            task_id,
-            status=TaskStatus.FAILED,
-            error=result.error,
-        )
+        fields = {"status": TaskStatus.FAILED, "error": result.error}
+
+    # Also verifies the task exists
+    if not await record_job_result(task_id, **fields):
+        raise HTTPException(status_code=404, detail="Task not found")
 
     # Send result to the worker workflow via DBOS.send()
     # The worker workflow is waiting on TOPIC_JOB_RESULT
-    from mainloop.workflows.worker import TOPIC_JOB_RESULT
-
     # Send to the worker workflow (which uses task_id as workflow ID via the queue)
     # Actually, we need to send to the workflow that's waiting
     # The worker_task_workflow is running with the task_id as part of its workflow context
     # We use DBOS.send with the workflow_id to target it
     workflow_id = task_id  # The worker workflow uses task_id for idempotency
 
-    DBOS.send(
+    await DBOS.send_async(
         workflow_id,
         {
             "status": result.status,
@@ -1020,92 +1101,91 @@ class DebugTaskInfo(BaseModel):
     k8s_jobs: list[str] = []
 
 
+# Bounds the K8s API load of debug views with many tasks (index misses only)
+_k8s_probe_semaphore = asyncio.Semaphore(settings.k8s_probe_concurrency)
+
+
+async def _probe_task_k8s(task_id: str) -> tuple[bool, list[str]]:
+    """Check whether a task's namespace exists and list its jobs."""
+    ns_exists = False
+    k8s_jobs = []
+    try:
+        async with _k8s_probe_semaphore:
+            ns_exists = await namespace_exists(task_id)
+            if ns_exists:
+                k8s_jobs = await list_task_jobs(task_id)
+    except Exception:
+        pass  # nosec B110
+    return ns_exists, k8s_jobs
+
+
 @app.get("/debug/tasks", response_model=list[DebugTaskInfo])
 async def debug_list_tasks(
     limit: int = 10,
 ):
     """List all tasks with debug info (no auth required for debugging)."""
-    from datetime import timezone
-
-    from mainloop.services.k8s_namespace import get_k8s_client, namespace_exists
-
-    # Get all tasks (bypass user filter for debugging)
+    # Get all tasks (bypass user filter for debugging) with their DBOS
+    # workflow status
     async with db.connection() as conn:
-        task_rows = await conn.fetch(
+        rows = await conn.fetch(
             """
-            SELECT * FROM worker_tasks
-            ORDER BY created_at DESC
+            SELECT t.*,
+                w.status AS wf_status,
+                left(w.error, 200) AS wf_error,
+                w.created_at AS wf_created_at,
+                w.updated_at AS wf_updated_at
+            FROM worker_tasks t
+            LEFT JOIN dbos.workflow_status w ON w.workflow_uuid = t.id
+            ORDER BY t.created_at DESC
             LIMIT $1
             """,
             limit,
         )
 
-        # Get workflow status for each task
-        results = []
-        for task_row in task_rows:
-            task = db._row_to_worker_task(task_row)
-
-            # Get DBOS workflow status
-            workflow_row = await conn.fetchrow(
-                """
-                SELECT status, error, created_at, updated_at
-                FROM dbos.workflow_status
-                WHERE workflow_uuid = $1
-                """,
-                task.id,
+    # Check task namespaces and jobs concurrently
+    tasks = [db._row_to_worker_task(row) for row in rows]
+    probes = await asyncio.gather(*(_probe_task_k8s(task.id) for task in tasks))
+
+    results = []
+    for row, task, (ns_exists, k8s_jobs) in zip(rows, tasks, probes, strict=True):
+        workflow_status = None
+        workflow_error = None
+        workflow_created_at = None
+        workflow_updated_at = None
+
+        if row["wf_status"] is not None:
+            workflow_status = row["wf_status"]
+            # Just show raw error string (it's base64-encoded pickle, but we show
+            # it raw); the query only fetches the part we show
+            if row["wf_error"]:
+                workflow_error = f"[encoded] {row['wf_error']}..."
+            workflow_created_at = datetime.fromtimestamp(
+                row["wf_created_at"] / 1000, tz=timezone.utc
+            )
+            workflow_updated_at = datetime.fromtimestamp(
+                row["wf_updated_at"] / 1000, tz=timezone.utc
             )
 
-            workflow_status = None
-            workflow_error = None
-            workflow_created_at = None
-            workflow_updated_at = None
-
-            if workflow_row:
-                workflow_status = workflow_row["status"]
-                # Just show raw error string (it's base64-encoded pickle, but we show it raw)
-                if workflow_row["error"]:
-                    workflow_error = f"[encoded] {workflow_row['error'][:200]}..."
-                workflow_created_at = datetime.fromtimestamp(
-                    workflow_row["created_at"] / 1000, tz=timezone.utc
-                )
-                workflow_updated_at = datetime.fromtimestamp(
-                    workflow_row["updated_at"] / 1000, tz=timezone.utc
-                )
-
-            # Check if namespace exists
-            ns_exists = False
-            k8s_jobs = []
-            try:
-                ns_exists = await namespace_exists(task.id)
-                if ns_exists:
-                    _, batch_v1 = get_k8s_client()
-                    namespace_name = f"task-{task.id[:8]}"
-                    jobs = batch_v1.list_namespaced_job(namespace=namespace_name)
-                    k8s_jobs = [j.metadata.name for j in jobs.items]
-            except Exception:
-                pass  # nosec B110
-
-            results.append(
-                DebugTaskInfo(
-                    task=task,
-                    workflow_status=workflow_status,
-                    workflow_error=workflow_error,
-                    workflow_created_at=workflow_created_at,
-                    workflow_updated_at=workflow_updated_at,
-                    namespace_exists=ns_exists,
-                    k8s_jobs=k8s_jobs,
-                )
+        results.append(
+            DebugTaskInfo.model_construct(
+                task=task,
+                workflow_status=workflow_status,
+                workflow_error=workflow_error,
+                workflow_created_at=workflow_created_at,
+                workflow_updated_at=workflow_updated_at,
+                namespace_exists=ns_exists,
+                k8s_jobs=k8s_jobs,
             )
+        )
 
-        return results
+    # Return the already-built models directly instead of having FastAPI
+    # validate and encode them again against response_model
+    return ORJSONResponse([info.model_dump(mode="json") for info in results])
 
 
 @app.post("/tasks/{task_id}/retry")
 async def retry_task(task_id: str):
     """Retry a failed task by resetting its status and re-enqueueing."""
-    from dbos import SetWorkflowID
-    from mainloop.workflows.dbos_config import worker_queue
-
     task = await db.get_worker_task(task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
@@ -1130,8 +1210,6 @@ async def retry_task(task_id: str):
 @app.delete("/debug/tasks/{task_id}/namespace")
 async def debug_delete_namespace(task_id: str):
     """Force delete a task namespace."""
-    from mainloop.services.k8s_namespace import delete_task_namespace
-
     await delete_task_namespace(task_id)
     return {"status": "deleted", "namespace": f"task-{task_id[:8]}"}
 
@@ -1164,8 +1242,6 @@ async def seed_task_for_testing(
             status_code=403, detail="Only available in test environment"
         )
 
-    from uuid import uuid4
-
     # Get or create a test main thread
     if not user_id:
         user_id = get_user_id_from_cf_header()
@@ -1177,31 +1253,28 @@ async def seed_task_for_testing(
     thread_id = thread.id
 
     # Create task
-    # Convert questions dict to TaskQuestion models if provided
+    # Convert questions dict to TaskQuestion models if provided (test data is
+    # trusted, so skip validation)
     pending_questions = None
     if request.questions:
-        from models.workflow import QuestionOption, TaskQuestion
-
         pending_questions = [
-            TaskQuestion(
+            TaskQuestion.model_construct(
                 id=q["id"],
                 header=q.get(
                     "header", q["question"][:30]
                 ),  # Default header from question
                 question=q["question"],
                 options=[
-                    QuestionOption(
+                    QuestionOption.model_construct(
                         label=opt["label"], description=opt.get("description")
                     )
-                    for opt in q.get("options", [])
+                    for opt in q.get("options", ())
                 ],
                 multi_select=q.get("multi_select", False),
                 response=None,
             )
             for q in request.questions
         ]
-        print(f"[DEBUG] Created {len(pending_questions)} pending_questions")
-        print(f"[DEBUG] pending_questions: {pending_questions}")
 
     task = WorkerTask(
         id=str(uuid4()),
@@ -1236,8 +1309,6 @@ async def seed_task_for_testing(
 
     # If task has questions, create a queue item
     if request.status == TaskStatus.WAITING_QUESTIONS and request.questions:
-        import json
-
         queue_item = QueueItem(
             id=str(uuid4()),
             main_thread_id=thread_id,
@@ -1245,7 +1316,7 @@ async def seed_task_for_testing(
             user_id=user_id,
             item_type=QueueItemType.QUESTION,
             title="Answer Questions",
-            content=json.dumps(request.questions),  # Serialize questions to string
+            content=orjson.dumps(request.questions).decode(),
             created_at=datetime.now(),
         )
         await db.create_queue_item(queue_item)
@@ -1264,20 +1335,19 @@ async def reset_test_data():
             status_code=403, detail="Only available in test environment"
         )
 
-    # Truncate all app tables (CASCADE handles foreign keys)
+    # Truncate all app tables and DBOS workflow state in one statement, so
+    # they are cleared atomically (CASCADE handles foreign keys)
     async with db.connection() as conn:
         await conn.execute(
             """
             TRUNCATE TABLE
                 queue_items, messages, worker_tasks, projects,
-                conversations, main_threads
+                conversations, main_threads,
+                dbos.workflow_events, dbos.operation_outputs, dbos.workflow_status
             CASCADE
         """
         )
-        # Clear DBOS workflow state
-        await conn.execute(
-            "TRUNCATE TABLE dbos.workflow_events, dbos.operation_outputs, dbos.workflow_status CASCADE"
-        )
+    db.clear_main_thread_ids()
 
     # Reset mock state if mocking is enabled
     if settings.use_mock_github:
@@ -1295,11 +1365,14 @@ def run():
     """Run the application."""
     import uvicorn
 
+    # Same server setup as the container; `make dev` runs with --reload.
+    # Single process: SSE subscribers and caches live in this process.
     uvicorn.run(
         "mainloop.api:app",
         host=settings.host,
         port=settings.port,
-        reload=True,
+        loop="uvloop",
+        http="httptools",
     )
 
 
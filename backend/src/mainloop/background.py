@@ -0,0 +1,35 @@
+"""Fire-and-forget background tasks that are tracked until they finish."""
+
+import asyncio
+import logging
+from typing import Coroutine
+
+logger = logging.getLogger(__name__)
+
+# Seconds to let background tasks finish on shutdown before cancelling them
+SHUTDOWN_TIMEOUT = 20
+
+# The event loop only keeps weak references to tasks, so hold on to them here
+# until they finish
+_tasks: set[asyncio.Task] = set()
+
+
+def spawn_background(coro: Coroutine) -> asyncio.Task:
+    """Run a coroutine in the background without awaiting it."""
+    task = asyncio.create_task(coro)
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+    return task
+
+
+async def drain_background_tasks():
+    """Wait for running background tasks, cancelling any that overrun."""
+    if not _tasks:
+        return
+
+    _, pending = await asyncio.wait(set(_tasks), timeout=SHUTDOWN_TIMEOUT)
+    for task in pending:
+        task.cancel()
+    if pending:
+        logger.warning(f"Cancelled {len(pending)} background task(s) on shutdown")
+        await asyncio.wait(pending)
@@ -20,12 +20,21 @@ class Settings(BaseSettings):
         """Construct database URL from parts."""
         return f"postgresql://{self.db_user}:{self.db_password}@{self.db_host}:{self.db_port}/{self.db_name}"
 
+    # Connection pool sizing (shared by all requests). pgbouncer runs in
+    # session mode, so every client connection pins a server connection:
+    # db_pool_max_size + 1 (task update LISTEN) + dbos_pool_size must stay
+    # within the pooler's default_pool_size
+    db_pool_min_size: int = 2
+    db_pool_max_size: int = 8
+    dbos_pool_size: int = 10
+
     # Claude
     claude_code_oauth_token: str = ""  # OAuth token for Claude Code API
     claude_agent_url: str = "http://claude-agent:8001"
     claude_workspace: str = "/workspace"
     claude_model: str = "sonnet"  # Main thread model
     claude_worker_model: str = "opus"  # Worker model (for background tasks)
+    claude_max_concurrency: int = 4  # Concurrent SDK sessions in the backend
 
     # GitHub
     github_token: str = ""
@@ -46,6 +55,17 @@ class Settings(BaseSettings):
         "http://mainloop-backend.mainloop.svc.cluster.local:8000"
     )
 
+    # Local `kubectl proxy` URL (e.g. http://127.0.0.1:8002). When set outside
+    # the cluster, API calls go through the proxy so TLS/auth happen once
+    kubectl_proxy_url: str = ""
+
+    # Default executor threads for blocking K8s client calls. Each job watch
+    # holds one for its whole duration, so this bounds concurrent watches
+    thread_pool_size: int = 64
+
+    # Max concurrent K8s API probes from debug views (shared by all requests)
+    k8s_probe_concurrency: int = 8
+
     # Test environment flag (enables test-only endpoints)
     is_test_env: bool = False
 
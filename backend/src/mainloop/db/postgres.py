@@ -1,11 +1,13 @@
 """PostgreSQL client for durable workflow persistence."""
 
-import json
+import asyncio
+import logging
 from contextlib import asynccontextmanager
 from datetime import datetime, timezone
-from typing import Any
+from typing import Any, Callable
 
 import asyncpg
+import orjson
 from mainloop.config import settings
 
 from models import (
@@ -16,10 +18,33 @@ from models import (
     QueueItem,
     QueueItemPriority,
     QueueItemType,
+    TaskQuestion,
     TaskStatus,
     WorkerTask,
 )
 
+logger = logging.getLogger(__name__)
+
+# Prepared statements cached per pooled connection. update_worker_task builds
+# its SET clause from the fields given, so the default of 100 would let those
+# variants evict the hot point lookups.
+STATEMENT_CACHE_SIZE = 1024
+
+# Seconds before a query is cancelled
+COMMAND_TIMEOUT = 60
+
+# Seconds the readiness probe's query may take
+HEALTH_CHECK_TIMEOUT = 2
+
+# NOTIFY channel carrying {"id", "user_id", "status"} whenever a task's status
+# is written
+TASK_UPDATES_CHANNEL = "worker_task_updates"
+
+# Seconds between attempts to restore a dropped LISTEN connection (doubling
+# up to the max)
+LISTENER_RETRY_DELAY = 1
+LISTENER_MAX_RETRY_DELAY = 30
+
 
 def _parse_json_field(value: Any) -> list | dict | None:
     """Parse a JSON field that might be a string or already parsed."""
@@ -29,8 +54,8 @@ def _parse_json_field(value: Any) -> list | dict | None:
         return value
     if isinstance(value, str):
         try:
-            return json.loads(value)
-        except json.JSONDecodeError:
+            return orjson.loads(value)
+        except orjson.JSONDecodeError:
             return None
     return None
 
@@ -117,10 +142,14 @@ CREATE TABLE IF NOT EXISTS conversations (
     summary TEXT,
     summarized_through_id TEXT,
     message_count INTEGER NOT NULL DEFAULT 0,
+    summarized_count INTEGER NOT NULL DEFAULT 0,
     created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
     updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
 );
-CREATE INDEX IF NOT EXISTS idx_conversations_user_id ON conversations(user_id);
+-- Serves the per-user conversation list (newest first) straight from the index
+DROP INDEX IF EXISTS idx_conversations_user_id;
+CREATE INDEX IF NOT EXISTS idx_conversations_user_updated
+    ON conversations(user_id, updated_at DESC);
 
 -- Messages
 CREATE TABLE IF NOT EXISTS messages (
@@ -218,6 +247,16 @@ BEGIN
     IF NOT EXISTS (SELECT 1 FROM information_schema.columns WHERE table_name='conversations' AND column_name='message_count') THEN
         ALTER TABLE conversations ADD COLUMN message_count INTEGER NOT NULL DEFAULT 0;
     END IF;
+    IF NOT EXISTS (SELECT 1 FROM information_schema.columns WHERE table_name='conversations' AND column_name='summarized_count') THEN
+        ALTER TABLE conversations ADD COLUMN summarized_count INTEGER NOT NULL DEFAULT 0;
+        -- Count the messages existing summaries already cover
+        UPDATE conversations c SET summarized_count = (
+            SELECT count(*) FROM messages m, messages s
+            WHERE s.id = c.summarized_through_id
+              AND m.conversation_id = c.id AND m.created_at <= s.created_at
+        )
+        WHERE c.summarized_through_id IS NOT NULL;
+    END IF;
     -- Drop deprecated claude_session_id if it exists
     IF EXISTS (SELECT 1 FROM information_schema.columns WHERE table_name='conversations' AND column_name='claude_session_id') THEN
         ALTER TABLE conversations DROP COLUMN claude_session_id;
@@ -287,6 +326,9 @@ END $$;
 CREATE INDEX IF NOT EXISTS idx_worker_tasks_keywords ON worker_tasks USING GIN(keywords);
 CREATE INDEX IF NOT EXISTS idx_worker_tasks_project ON worker_tasks(project_id);
 CREATE INDEX IF NOT EXISTS idx_queue_items_read_at ON queue_items(read_at);
+-- Unread badge count only visits the (few) unread pending items
+CREATE INDEX IF NOT EXISTS idx_queue_items_unread ON queue_items(user_id)
+    WHERE read_at IS NULL AND status = 'pending';
 """
 
 
@@ -295,6 +337,15 @@ class Database:
 
     def __init__(self):
         self._pool: asyncpg.Pool | None = None
+        # Dedicated connection for LISTEN (pooled connections drop listeners
+        # when released)
+        self._listener: asyncpg.Connection | None = None
+        self._listener_reconnect: asyncio.Task | None = None
+        self._task_update_callback: Callable[[dict], None] | None = None
+        self._task_update_resync: Callable[[], None] | None = None
+        # user_id -> main thread record ID (see get_main_thread_id)
+        self._main_thread_ids: dict[str, str] = {}
+        self._tables_verified = False
 
     async def connect(self):
         """Create connection pool."""
@@ -302,12 +353,24 @@ class Database:
             return
         self._pool = await asyncpg.create_pool(
             settings.database_url,
-            min_size=2,
-            max_size=10,
+            min_size=settings.db_pool_min_size,
+            max_size=settings.db_pool_max_size,
+            statement_cache_size=STATEMENT_CACHE_SIZE,
+            # Keep plans for the life of the connection instead of 5 minutes
+            max_cached_statement_lifetime=0,
+            # Don't let a hung query hold a pooled connection indefinitely
+            command_timeout=COMMAND_TIMEOUT,
         )
 
     async def disconnect(self):
         """Close connection pool."""
+        if self._listener_reconnect:
+            self._listener_reconnect.cancel()
+            self._listener_reconnect = None
+        if self._listener:
+            # Cleared first so the termination listener doesn't reconnect
+            listener, self._listener = self._listener, None
+            await listener.close()
         if self._pool:
             await self._pool.close()
             self._pool = None
@@ -320,13 +383,85 @@ class Database:
         async with self._pool.acquire() as conn:
             yield conn
 
-    async def ensure_tables_exist(self):
-        """Create tables if they don't exist and run migrations."""
+    async def health_check(self) -> dict[str, int]:
+        """Run a trivial query through the pool and return its usage.
+
+        Raises if the database can't be reached.
+        """
         if not self._pool:
+            raise RuntimeError("Database pool not connected")
+        async with self.connection() as conn:
+            await conn.fetchval("SELECT 1", timeout=HEALTH_CHECK_TIMEOUT)
+        return {
+            "size": self._pool.get_size(),
+            "idle": self._pool.get_idle_size(),
+            "max_size": self._pool.get_max_size(),
+        }
+
+    async def listen_task_updates(
+        self,
+        callback: Callable[[dict], None],
+        on_resync: Callable[[], None] | None = None,
+    ):
+        """Call back with {"id", "user_id", "status"} on task status writes.
+
+        Notifications come from any process writing to the database, e.g.
+        workflow steps as well as API endpoints. If the listening connection
+        drops it is re-established with backoff, then on_resync is called
+        since notifications sent while it was down are lost.
+        """
+        self._task_update_callback = callback
+        self._task_update_resync = on_resync
+        await self._connect_listener()
+
+    async def _connect_listener(self):
+        def on_notify(conn, pid, channel, payload):
+            self._task_update_callback(orjson.loads(payload))
+
+        listener = await asyncpg.connect(settings.database_url)
+        self._listener = listener
+        listener.add_termination_listener(self._on_listener_terminated)
+        try:
+            await listener.add_listener(TASK_UPDATES_CHANNEL, on_notify)
+        except Exception:
+            self._listener = None
+            await listener.close()
+            raise
+
+    def _on_listener_terminated(self, conn: asyncpg.Connection):
+        if conn is not self._listener:  # Closed on purpose
+            return
+        logger.error("Task update listener connection lost, reconnecting")
+        self._listener = None
+        self._listener_reconnect = asyncio.create_task(self._reconnect_listener())
+
+    async def _reconnect_listener(self):
+        delay = LISTENER_RETRY_DELAY
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                await self._connect_listener()
+            except Exception as e:
+                logger.warning(f"Task update listener reconnect failed: {e}")
+                delay = min(delay * 2, LISTENER_MAX_RETRY_DELAY)
+            else:
+                logger.info("Task update listener reconnected")
+                self._listener_reconnect = None
+                if self._task_update_resync:
+                    self._task_update_resync()
+                return
+
+    async def ensure_tables_exist(self):
+        """Create tables if they don't exist and run migrations.
+
+        Runs at most once per process; schema and migrations are sent as a
+        single multi-statement round-trip.
+        """
+        if not self._pool or self._tables_verified:
             return
         async with self.connection() as conn:
-            await conn.execute(SCHEMA_SQL)
-            await conn.execute(MIGRATION_SQL)
+            await conn.execute(SCHEMA_SQL + MIGRATION_SQL)
+        self._tables_verified = True
 
     # ============= Main Thread Operations =============
 
@@ -335,22 +470,41 @@ class Database:
         if not self._pool:
             return thread
         async with self.connection() as conn:
-            await conn.execute(
-                """
-                INSERT INTO main_threads (id, user_id, workflow_run_id, status, created_at, last_activity_at, active_tasks, context)
-                VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
-                """,
-                thread.id,
-                thread.user_id,
-                thread.workflow_run_id,
-                thread.status,
-                thread.created_at,
-                thread.last_activity_at,
-                thread.active_tasks,
-                json.dumps(thread.context) if thread.context else "{}",
-            )
+            await self._insert_main_thread(conn, thread)
         return thread
 
+    async def _insert_main_thread(
+        self, conn: asyncpg.Connection, thread: MainThread
+    ) -> None:
+        await conn.execute(
+            """
+            INSERT INTO main_threads (id, user_id, workflow_run_id, status, created_at, last_activity_at, active_tasks, context)
+            VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
+            """,
+            thread.id,
+            thread.user_id,
+            thread.workflow_run_id,
+            thread.status,
+            thread.created_at,
+            thread.last_activity_at,
+            thread.active_tasks,
+            orjson.dumps(thread.context).decode() if thread.context else "{}",
+        )
+        # The user's thread lookup may now return the new record
+        self._main_thread_ids.pop(thread.user_id, None)
+
+    async def create_thread_and_task(
+        self, thread: MainThread, task: WorkerTask
+    ) -> tuple[MainThread, WorkerTask]:
+        """Create a main thread and a worker task on it in one transaction."""
+        if not self._pool:
+            return thread, task
+        async with self.connection() as conn:
+            async with conn.transaction():
+                await self._insert_main_thread(conn, thread)
+                await self._insert_worker_task(conn, task)
+        return thread, task
+
     async def get_main_thread(self, thread_id: str) -> MainThread | None:
         """Get a main thread by ID."""
         if not self._pool:
@@ -375,6 +529,29 @@ class Database:
             return None
         return self._row_to_main_thread(row)
 
+    async def get_main_thread_id(self, user_id: str) -> str | None:
+        """Get the ID of the user's main thread record.
+
+        IDs are cached per user. Creating a main thread drops the user's
+        entry, and clear_main_thread_ids() drops all of them (call it after
+        deleting main threads).
+        """
+        if thread_id := self._main_thread_ids.get(user_id):
+            return thread_id
+        if not self._pool:
+            return None
+        async with self.connection() as conn:
+            thread_id = await conn.fetchval(
+                "SELECT id FROM main_threads WHERE user_id = $1 LIMIT 1", user_id
+            )
+        if thread_id:
+            self._main_thread_ids[user_id] = thread_id
+        return thread_id
+
+    def clear_main_thread_ids(self):
+        """Forget all cached main thread record IDs."""
+        self._main_thread_ids.clear()
+
     async def update_main_thread(
         self,
         thread_id: str,
@@ -436,7 +613,7 @@ class Database:
             if isinstance(raw_context, dict):
                 context = raw_context
             elif raw_context:
-                context = json.loads(raw_context)
+                context = orjson.loads(raw_context)
             else:
                 context = {}
 
@@ -455,7 +632,7 @@ class Database:
 
             await conn.execute(
                 "UPDATE main_threads SET context = $1, last_activity_at = $2 WHERE id = $3",
-                json.dumps(context),
+                orjson.dumps(context).decode(),
                 datetime.now(timezone.utc),
                 thread_id,
             )
@@ -477,7 +654,7 @@ class Database:
             if isinstance(raw_context, dict):
                 context = raw_context
             elif raw_context:
-                context = json.loads(raw_context)
+                context = orjson.loads(raw_context)
             else:
                 context = {}
 
@@ -527,7 +704,7 @@ class Database:
             context=(
                 row["context"]
                 if isinstance(row["context"], dict)
-                else (json.loads(row["context"]) if row["context"] else {})
+                else (orjson.loads(row["context"]) if row["context"] else {})
             ),
         )
 
@@ -538,43 +715,46 @@ class Database:
         if not self._pool:
             return task
         async with self.connection() as conn:
-            # Serialize pending_questions to JSON for storage
-            import json
+            await self._insert_worker_task(conn, task)
+        return task
 
-            pending_questions_json = (
-                json.dumps([q.model_dump() for q in task.pending_questions])
-                if task.pending_questions
-                else None
-            )
+    async def _insert_worker_task(
+        self, conn: asyncpg.Connection, task: WorkerTask
+    ) -> None:
+        # Serialize pending_questions to JSON for storage
+        pending_questions_json = (
+            orjson.dumps([q.model_dump() for q in task.pending_questions]).decode()
+            if task.pending_questions
+            else None
+        )
 
-            await conn.execute(
-                """
-                INSERT INTO worker_tasks
-                (id, main_thread_id, user_id, task_type, description, prompt, model,
-                 repo_url, branch_name, base_branch, status, created_at,
-                 conversation_id, message_id, keywords, skip_plan, plan_text, pending_questions)
-                VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15, $16, $17, $18)
-                """,
-                task.id,
-                task.main_thread_id,
-                task.user_id,
-                task.task_type,
-                task.description,
-                task.prompt,
-                task.model,
-                task.repo_url,
-                task.branch_name,
-                task.base_branch,
-                task.status.value,
-                task.created_at,
-                task.conversation_id,
-                task.message_id,
-                task.keywords,
-                task.skip_plan,
-                task.plan_text,
-                pending_questions_json,
-            )
-        return task
+        await conn.execute(
+            """
+            INSERT INTO worker_tasks
+            (id, main_thread_id, user_id, task_type, description, prompt, model,
+             repo_url, branch_name, base_branch, status, created_at,
+             conversation_id, message_id, keywords, skip_plan, plan_text, pending_questions)
+            VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15, $16, $17, $18)
+            """,
+            task.id,
+            task.main_thread_id,
+            task.user_id,
+            task.task_type,
+            task.description,
+            task.prompt,
+            task.model,
+            task.repo_url,
+            task.branch_name,
+            task.base_branch,
+            task.status.value,
+            task.created_at,
+            task.conversation_id,
+            task.message_id,
+            task.keywords,
+            task.skip_plan,
+            task.plan_text,
+            pending_questions_json,
+        )
 
     async def get_worker_task(self, task_id: str) -> WorkerTask | None:
         """Get a worker task by ID."""
@@ -673,7 +853,7 @@ class Database:
             param_idx += 1
         if result is not None:
             updates.append(f"result = ${param_idx}")
-            params.append(json.dumps(result))
+            params.append(orjson.dumps(result).decode())
             param_idx += 1
         if error is not None:
             updates.append(f"error = ${param_idx}")
@@ -729,7 +909,9 @@ class Database:
             updates.append(f"pending_questions = ${param_idx}")
             # Empty list clears (stores null), non-empty stores as JSON string
             # asyncpg requires explicit JSON serialization for JSONB columns
-            params.append(json.dumps(pending_questions) if pending_questions else None)
+            params.append(
+                orjson.dumps(pending_questions).decode() if pending_questions else None
+            )
             param_idx += 1
         if plan_text is not None:
             updates.append(f"plan_text = ${param_idx}")
@@ -738,15 +920,111 @@ class Database:
 
         params.append(task_id)
 
-        if updates:
-            async with self.connection() as conn:
-                await conn.execute(
-                    f"UPDATE worker_tasks SET {', '.join(updates)} WHERE id = ${param_idx}",
-                    *params,
+        if not updates:
+            return
+
+        query = f"UPDATE worker_tasks SET {', '.join(updates)} WHERE id = ${param_idx}"
+        if status is not None:
+            # Publish the status change in the same statement
+            query = f"""
+                WITH updated AS ({query} RETURNING id, user_id, status)
+                SELECT pg_notify(
+                    '{TASK_UPDATES_CHANNEL}',
+                    json_build_object('id', id, 'user_id', user_id, 'status', status)::text
                 )
+                FROM updated
+            """
+        async with self.connection() as conn:
+            await conn.execute(query, *params)
+
+    async def record_job_results(self, results: dict[str, dict[str, Any]]) -> set[str]:
+        """Store a batch of job callback results in one statement.
+
+        Args:
+            results: task_id -> fields to set (status, result, error,
+                issue_url, issue_number, pr_url, pr_number). Missing or None
+                fields are left unchanged, as in update_worker_task; tasks
+                with no fields are only looked up.
+
+        Returns:
+            IDs of the tasks that exist
+
+        """
+        if not self._pool:
+            return set()
+
+        batch = list(results.values())
+
+        def column(name: str) -> list:
+            return [fields.get(name) for fields in batch]
+
+        async with self.connection() as conn:
+            rows = await conn.fetch(
+                f"""
+                WITH v AS (
+                    SELECT * FROM unnest(
+                        $1::text[], $2::text[], $3::text[], $4::text[],
+                        $5::text[], $6::int[], $7::text[], $8::int[]
+                    ) AS v(
+                        id, status, result, error,
+                        issue_url, issue_number, pr_url, pr_number
+                    )
+                ),
+                updated AS (
+                    UPDATE worker_tasks AS t SET
+                        status = COALESCE(v.status, t.status),
+                        result = COALESCE(v.result::jsonb, t.result),
+                        error = COALESCE(v.error, t.error),
+                        issue_url = COALESCE(v.issue_url, t.issue_url),
+                        issue_number = COALESCE(v.issue_number, t.issue_number),
+                        pr_url = COALESCE(v.pr_url, t.pr_url),
+                        pr_number = COALESCE(v.pr_number, t.pr_number)
+                    FROM v
+                    WHERE t.id = v.id AND num_nonnulls(
+                        v.status, v.result, v.error,
+                        v.issue_url, v.issue_number, v.pr_url, v.pr_number
+                    ) > 0
+                    RETURNING t.id, t.user_id, t.status,
+                        v.status IS NOT NULL AS status_set
+                )
+                -- Publish status changes, as update_worker_task does
+                SELECT id, CASE WHEN status_set THEN pg_notify(
+                    '{TASK_UPDATES_CHANNEL}',
+                    json_build_object('id', id, 'user_id', user_id, 'status', status)::text
+                )::text END
+                FROM updated
+                UNION ALL
+                -- Callbacks with nothing to set only check that the task
+                -- exists, without writing a row version
+                SELECT t.id, NULL::text
+                FROM worker_tasks AS t JOIN v ON t.id = v.id
+                WHERE num_nonnulls(
+                    v.status, v.result, v.error,
+                    v.issue_url, v.issue_number, v.pr_url, v.pr_number
+                ) = 0
+                """,
+                list(results),
+                [
+                    status.value if isinstance(status, TaskStatus) else status
+                    for status in column("status")
+                ],
+                [
+                    orjson.dumps(result).decode() if result is not None else None
+                    for result in column("result")
+                ],
+                column("error"),
+                column("issue_url"),
+                column("issue_number"),
+                column("pr_url"),
+                column("pr_number"),
+            )
+        return {row["id"] for row in rows}
 
     def _row_to_worker_task(self, row: asyncpg.Record) -> WorkerTask:
-        return WorkerTask(
+        # Columns already have the model's types, so skip validation (except
+        # for the nested questions, which are stored as plain JSON)
+        pending_questions = _parse_json_field(row.get("pending_questions"))
+        return WorkerTask.model_construct(
             id=row["id"],
             main_thread_id=row["main_thread_id"],
             user_id=row["user_id"],
@@ -767,7 +1045,7 @@ class Database:
             result=(
                 row["result"]
                 if isinstance(row["result"], dict)
-                else (json.loads(row["result"]) if row["result"] else None)
+                else (orjson.loads(row["result"]) if row["result"] else None)
             ),
             error=row["error"],
             # Issue fields (plan phase)
@@ -787,7 +1065,11 @@ class Database:
             skip_plan=row.get("skip_plan", False),
             # Interactive planning state
             # Handle both JSONB (returns list) and legacy string data
-            pending_questions=_parse_json_field(row.get("pending_questions")),
+            pending_questions=(
+                [TaskQuestion.model_validate(q) for q in pending_questions]
+                if pending_questions is not None
+                else None
+            ),
             plan_text=row.get("plan_text"),
         )
 
@@ -1017,7 +1299,7 @@ class Database:
                 item.priority.value,
                 item.title,
                 item.content,
-                json.dumps(item.context) if item.context else "{}",
+                orjson.dumps(item.context).decode() if item.context else "{}",
                 item.options,
                 item.status,
                 item.created_at,
@@ -1180,7 +1462,7 @@ class Database:
             context=(
                 row["context"]
                 if isinstance(row["context"], dict)
-                else (json.loads(row["context"]) if row["context"] else {})
+                else (orjson.loads(row["context"]) if row["context"] else {})
             ),
             options=list(row["options"]) if row["options"] else None,
             status=row["status"],
@@ -1199,13 +1481,14 @@ class Database:
         """Create a new conversation."""
         import uuid
 
+        now = datetime.now(timezone.utc)
         conversation = Conversation(
             id=str(uuid.uuid4()),
             user_id=user_id,
             title=title or "New Conversation",
             message_count=0,
-            created_at=datetime.now(timezone.utc),
-            updated_at=datetime.now(timezone.utc),
+            created_at=now,
+            updated_at=now,
         )
         if not self._pool:
             return conversation
@@ -1239,13 +1522,18 @@ class Database:
     async def list_conversations(
         self, user_id: str, limit: int = 50
     ) -> list[Conversation]:
-        """List conversations for a user."""
+        """List conversations for a user.
+
+        Summaries are left out: they are only needed for a single
+        conversation's context and can be several paragraphs each.
+        """
         if not self._pool:
             return []
         async with self.connection() as conn:
             rows = await conn.fetch(
                 """
-                SELECT * FROM conversations
+                SELECT id, user_id, title, message_count, created_at, updated_at
+                FROM conversations
                 WHERE user_id = $1
                 ORDER BY updated_at DESC
                 LIMIT $2
@@ -1260,40 +1548,34 @@ class Database:
         conversation_id: str,
         summary: str,
         summarized_through_id: str,
+        newly_summarized: int,
     ) -> None:
-        """Update the compaction summary for a conversation."""
+        """Update the compaction summary for a conversation.
+
+        Args:
+            conversation_id: The conversation ID
+            summary: Summary covering all messages through summarized_through_id
+            summarized_through_id: ID of the last message the summary covers
+            newly_summarized: Number of messages added to the summary
+
+        """
         if not self._pool:
             return
         async with self.connection() as conn:
             await conn.execute(
                 """
                 UPDATE conversations
-                SET summary = $1, summarized_through_id = $2, updated_at = $3
-                WHERE id = $4
+                SET summary = $1, summarized_through_id = $2,
+                    summarized_count = summarized_count + $3, updated_at = $4
+                WHERE id = $5
                 """,
                 summary,
                 summarized_through_id,
+                newly_summarized,
                 datetime.now(timezone.utc),
                 conversation_id,
             )
 
-    async def increment_message_count(self, conversation_id: str) -> int:
-        """Increment message count and return new value."""
-        if not self._pool:
-            return 0
-        async with self.connection() as conn:
-            row = await conn.fetchrow(
-                """
-                UPDATE conversations
-                SET message_count = message_count + 1, updated_at = $1
-                WHERE id = $2
-                RETURNING message_count
-                """,
-                datetime.now(timezone.utc),
-                conversation_id,
-            )
-        return row["message_count"] if row else 0
-
     def _row_to_conversation(self, row: asyncpg.Record) -> Conversation:
         return Conversation(
             id=row["id"],
@@ -1308,8 +1590,14 @@ class Database:
 
     async def create_message(
         self, conversation_id: str, role: str, content: str
-    ) -> Message:
-        """Create a new message in a conversation."""
+    ) -> tuple[Message, int]:
+        """Create a new message in a conversation.
+
+        Returns:
+            The message and the number of the conversation's messages not yet
+            covered by its summary
+
+        """
         import uuid
 
         message = Message(
@@ -1320,12 +1608,20 @@ class Database:
             created_at=datetime.now(timezone.utc),
         )
         if not self._pool:
-            return message
+            return message, 0
         async with self.connection() as conn:
-            await conn.execute(
+            # Insert the message and bump the conversation's count and
+            # updated_at in one round trip
+            row = await conn.fetchrow(
                 """
-                INSERT INTO messages (id, conversation_id, role, content, created_at)
-                VALUES ($1, $2, $3, $4, $5)
+                WITH inserted AS (
+                    INSERT INTO messages (id, conversation_id, role, content, created_at)
+                    VALUES ($1, $2, $3, $4, $5)
+                )
+                UPDATE conversations
+                SET message_count = message_count + 1, updated_at = $5
+                WHERE id = $2
+                RETURNING message_count - summarized_count AS unsummarized
                 """,
                 message.id,
                 message.conversation_id,
@@ -1333,13 +1629,7 @@ class Database:
                 message.content,
                 message.created_at,
             )
-            # Update conversation's updated_at
-            await conn.execute(
-                "UPDATE conversations SET updated_at = $1 WHERE id = $2",
-                datetime.now(timezone.utc),
-                conversation_id,
-            )
-        return message
+        return message, row["unsummarized"] if row else 0
 
     async def get_messages(self, conversation_id: str) -> list[Message]:
         """Get all messages for a conversation."""
@@ -1386,55 +1676,36 @@ class Database:
         rows = list(reversed(rows))
         return [self._row_to_message(row) for row in rows]
 
-    async def get_messages_after(
-        self, conversation_id: str, after_message_id: str | None, limit: int = 20
+    async def get_unsummarized_messages(
+        self, conversation_id: str, limit: int = 20
     ) -> list[Message]:
-        """Get messages after a specific message ID (for unsummarized messages)."""
+        """Get the latest messages not yet covered by the conversation summary.
+
+        The summary cut-off is resolved in the same query, so this doesn't need
+        the conversation to be loaded first.
+        """
         if not self._pool:
             return []
         async with self.connection() as conn:
-            if after_message_id:
-                # Get the timestamp of the after_message_id
-                ref_row = await conn.fetchrow(
-                    "SELECT created_at FROM messages WHERE id = $1",
-                    after_message_id,
-                )
-                if ref_row:
-                    rows = await conn.fetch(
-                        """
-                        SELECT * FROM messages
-                        WHERE conversation_id = $1 AND created_at > $2
-                        ORDER BY created_at DESC
-                        LIMIT $3
-                        """,
-                        conversation_id,
-                        ref_row["created_at"],
-                        limit,
-                    )
-                else:
-                    # Reference message not found, get recent
-                    rows = await conn.fetch(
-                        """
-                        SELECT * FROM messages
-                        WHERE conversation_id = $1
-                        ORDER BY created_at DESC
-                        LIMIT $2
-                        """,
-                        conversation_id,
-                        limit,
-                    )
-            else:
-                # No reference, get recent messages
-                rows = await conn.fetch(
-                    """
-                    SELECT * FROM messages
-                    WHERE conversation_id = $1
-                    ORDER BY created_at DESC
-                    LIMIT $2
-                    """,
-                    conversation_id,
-                    limit,
-                )
+            rows = await conn.fetch(
+                """
+                SELECT * FROM messages
+                WHERE conversation_id = $1
+                  AND created_at > COALESCE(
+                      (
+                          SELECT m.created_at
+                          FROM conversations c
+                          JOIN messages m ON m.id = c.summarized_through_id
+                          WHERE c.id = $1
+                      ),
+                      '-infinity'
+                  )
+                ORDER BY created_at DESC
+                LIMIT $2
+                """,
+                conversation_id,
+                limit,
+            )
         # Reverse to get chronological order
         rows = list(reversed(rows))
         return [self._row_to_message(row) for row in rows]
@@ -1442,7 +1713,7 @@ class Database:
     async def get_messages_for_compaction(
         self, conversation_id: str, up_to_count: int
     ) -> list[Message]:
-        """Get oldest messages for compaction (up to a count)."""
+        """Get the oldest messages not yet covered by the summary (up to a count)."""
         if not self._pool:
             return []
         async with self.connection() as conn:
@@ -1450,6 +1721,15 @@ class Database:
                 """
                 SELECT * FROM messages
                 WHERE conversation_id = $1
+                  AND created_at > COALESCE(
+                      (
+                          SELECT m.created_at
+                          FROM conversations c
+                          JOIN messages m ON m.id = c.summarized_through_id
+                          WHERE c.id = $1
+                      ),
+                      '-infinity'
+                  )
                 ORDER BY created_at ASC
                 LIMIT $2
                 """,
@@ -17,6 +17,7 @@ from claude_agent_sdk import (
 from dbos import SetWorkflowID
 from mainloop.config import settings
 from mainloop.db import db
+from mainloop.services.claude_sessions import claude_session_slots
 from mainloop.services.task_router import (
     extract_keywords,
     find_matching_tasks,
@@ -381,28 +382,29 @@ async def get_claude_response(
         collected_text = []
         compaction_count: int = 0
 
-        async for msg in query(prompt=prompt, options=options):
-            if isinstance(msg, AssistantMessage):
-                for block in msg.content:
-                    if isinstance(block, TextBlock):
-                        collected_text.append(block.text)
-            elif isinstance(msg, ResultMessage):
-                if msg.is_error:
-                    return ClaudeResponse(
-                        text=f"Sorry, I encountered an error: {msg.result or 'Unknown error'}",
-                        compacted=compaction_count > 0,
-                        compaction_count=compaction_count,
-                    )
-            elif isinstance(msg, SystemMessage):
-                # Track compaction events (context was automatically summarized)
-                if msg.subtype == "compact_boundary":
-                    compaction_count += 1
-                    data = msg.data or {}
-                    pre_tokens = data.get("pre_tokens", 0)
-                    trigger = data.get("trigger", "unknown")
-                    logger.info(
-                        f"Context compacted ({trigger}): {pre_tokens} tokens summarized"
-                    )
+        async with claude_session_slots:
+            async for msg in query(prompt=prompt, options=options):
+                if isinstance(msg, AssistantMessage):
+                    for block in msg.content:
+                        if isinstance(block, TextBlock):
+                            collected_text.append(block.text)
+                elif isinstance(msg, ResultMessage):
+                    if msg.is_error:
+                        return ClaudeResponse(
+                            text=f"Sorry, I encountered an error: {msg.result or 'Unknown error'}",
+                            compacted=compaction_count > 0,
+                            compaction_count=compaction_count,
+                        )
+                elif isinstance(msg, SystemMessage):
+                    # Track compaction events (context was automatically summarized)
+                    if msg.subtype == "compact_boundary":
+                        compaction_count += 1
+                        data = msg.data or {}
+                        pre_tokens = data.get("pre_tokens", 0)
+                        trigger = data.get("trigger", "unknown")
+                        logger.info(
+                            f"Context compacted ({trigger}): {pre_tokens} tokens summarized"
+                        )
 
         return ClaudeResponse(
             text=(
@@ -20,12 +20,28 @@ class ExecuteResponse(BaseModel):
 
 
 class ClaudeAgentClient:
-    """HTTP client for the Claude Agent container."""
+    """HTTP client for the Claude Agent container.
+
+    Requests share one connection pool so concurrent calls reuse
+    keep-alive connections instead of connecting per request.
+    """
 
     def __init__(self, base_url: str | None = None):
         self.base_url = (
             base_url or settings.claude_agent_url or "http://claude-agent:8001"
         )
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(300.0, connect=5.0),
+            limits=httpx.Limits(
+                max_connections=100,
+                max_keepalive_connections=50,
+                keepalive_expiry=60.0,
+            ),
+        )
+
+    async def aclose(self):
+        """Close the pooled connections."""
+        await self.client.aclose()
 
     async def execute(
         self,
@@ -47,29 +63,29 @@ class ClaudeAgentClient:
             ExecuteResponse with output or error
 
         """
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            try:
-                response = await client.post(
-                    f"{self.base_url}/execute",
-                    json={
-                        "prompt": prompt,
-                        "model": model,
-                    },
-                )
-                response.raise_for_status()
-                return ExecuteResponse(**response.json())
-            except httpx.HTTPStatusError as e:
-                logger.error(f"Claude agent HTTP error: {e}")
-                return ExecuteResponse(
-                    output="",
-                    error=f"HTTP {e.response.status_code}: {e.response.text}",
-                )
-            except httpx.RequestError as e:
-                logger.error(f"Claude agent request error: {e}")
-                return ExecuteResponse(
-                    output="",
-                    error=f"Request failed: {str(e)}",
-                )
+        try:
+            response = await self.client.post(
+                f"{self.base_url}/execute",
+                json={
+                    "prompt": prompt,
+                    "model": model,
+                },
+                timeout=timeout,
+            )
+            response.raise_for_status()
+            return ExecuteResponse(**response.json())
+        except httpx.HTTPStatusError as e:
+            logger.error(f"Claude agent HTTP error: {e}")
+            return ExecuteResponse(
+                output="",
+                error=f"HTTP {e.response.status_code}: {e.response.text}",
+            )
+        except httpx.RequestError as e:
+            logger.error(f"Claude agent request error: {e}")
+            return ExecuteResponse(
+                output="",
+                error=f"Request failed: {str(e)}",
+            )
 
     async def execute_stream(
         self,
@@ -86,40 +102,39 @@ class ClaudeAgentClient:
         """
         import json
 
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            try:
-                async with client.stream(
-                    "POST",
-                    f"{self.base_url}/execute/stream",
-                    json={
-                        "prompt": prompt,
-                        "model": model,
-                    },
-                ) as response:
-                    response.raise_for_status()
-                    async for line in response.aiter_lines():
-                        if line.startswith("data: "):
-                            data = line[6:]
-                            if data == "[DONE]":
-                                break
-                            try:
-                                yield json.loads(data)
-                            except json.JSONDecodeError:
-                                continue
-            except httpx.HTTPStatusError as e:
-                yield {"type": "error", "error": f"HTTP {e.response.status_code}"}
-            except httpx.RequestError as e:
-                yield {"type": "error", "error": str(e)}
+        try:
+            async with self.client.stream(
+                "POST",
+                f"{self.base_url}/execute/stream",
+                json={
+                    "prompt": prompt,
+                    "model": model,
+                },
+                timeout=timeout,
+            ) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if line.startswith("data: "):
+                        data = line[6:]
+                        if data == "[DONE]":
+                            break
+                        try:
+                            yield json.loads(data)
+                        except json.JSONDecodeError:
+                            continue
+        except httpx.HTTPStatusError as e:
+            yield {"type": "error", "error": f"HTTP {e.response.status_code}"}
+        except httpx.RequestError as e:
+            yield {"type": "error", "error": str(e)}
 
     async def health_check(self) -> dict:
         """Check if the Claude Agent service is healthy."""
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            try:
-                response = await client.get(f"{self.base_url}/health")
-                response.raise_for_status()
-                return response.json()
-            except Exception as e:
-                return {"status": "error", "error": str(e)}
+        try:
+            response = await self.client.get(f"{self.base_url}/health", timeout=5.0)
+            response.raise_for_status()
+            return response.json()
+        except Exception as e:
+            return {"status": "error", "error": str(e)}
 
 
 # Singleton client instance
@@ -132,3 +147,11 @@ def get_claude_agent_client() -> ClaudeAgentClient:
     if _client is None:
         _client = ClaudeAgentClient()
     return _client
+
+
+async def close_claude_agent_client():
+    """Close the singleton client's connections."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -0,0 +1,9 @@
+"""Limit on concurrent Claude Agent SDK sessions in the backend process."""
+
+import asyncio
+
+from mainloop.config import settings
+
+# Each query() runs a Claude Code CLI subprocess in this pod, so chat turns
+# and compactions wait for a slot instead of starting without bound
+claude_session_slots = asyncio.Semaphore(settings.claude_max_concurrency)
@@ -4,7 +4,6 @@ Summarizes older messages to manage context window while preserving conversation
 Runs asynchronously to avoid blocking the main chat flow.
 """
 
-import asyncio
 import logging
 
 from claude_agent_sdk import (
@@ -14,21 +13,32 @@ from claude_agent_sdk import (
     TextBlock,
     query,
 )
+from mainloop.background import spawn_background
 from mainloop.config import settings
 from mainloop.db import db
+from mainloop.services.claude_sessions import claude_session_slots
 
 from models import Message
 
 logger = logging.getLogger(__name__)
 
 # Compaction thresholds
-COMPACTION_THRESHOLD = 40  # Trigger compaction when message_count exceeds this
-MESSAGES_TO_SUMMARIZE = 30  # Number of oldest messages to summarize
+COMPACTION_THRESHOLD = 40  # Trigger compaction when unsummarized messages exceed this
+MESSAGES_TO_SUMMARIZE = 30  # Number of oldest unsummarized messages to summarize
 RECENT_MESSAGES_TO_KEEP = 10  # Keep this many recent messages unsummarized
 
+# Conversations with a compaction in flight (later triggers are skipped)
+_compacting: set[str] = set()
 
-async def summarize_messages(messages: list[Message]) -> str:
-    """Use Claude to summarize a list of messages."""
+
+async def summarize_messages(
+    messages: list[Message], previous_summary: str | None = None
+) -> str:
+    """Use Claude to summarize a list of messages.
+
+    If previous_summary is given, the messages are folded into it and the
+    result covers both, so only new messages are ever sent for summarizing.
+    """
     if not messages:
         return ""
 
@@ -40,7 +50,22 @@ async def summarize_messages(messages: list[Message]) -> str:
 
     conversation_text = "\n\n".join(formatted)
 
-    prompt = f"""Summarize this conversation concisely, preserving key information:
+    if previous_summary:
+        prompt = f"""Update this conversation summary with the newer messages below, preserving key information:
+- Important facts mentioned (names, preferences, decisions)
+- Key topics discussed
+- Any commitments or action items
+- Context needed to continue the conversation naturally
+
+Previous summary:
+{previous_summary}
+
+Newer messages:
+{conversation_text}
+
+Write a concise updated summary (2-4 paragraphs) that captures the essential context of the whole conversation."""
+    else:
+        prompt = f"""Summarize this conversation concisely, preserving key information:
 - Important facts mentioned (names, preferences, decisions)
 - Key topics discussed
 - Any commitments or action items
@@ -58,15 +83,16 @@ Write a concise summary (2-4 paragraphs) that captures the essential context."""
         )
 
         collected_text: list[str] = []
-        async for msg in query(prompt=prompt, options=options):
-            if isinstance(msg, AssistantMessage):
-                for block in msg.content:
-                    if isinstance(block, TextBlock):
-                        collected_text.append(block.text)
-            elif isinstance(msg, ResultMessage):
-                if msg.is_error:
-                    logger.error(f"Summarization error: {msg.result}")
-                    return ""
+        async with claude_session_slots:
+            async for msg in query(prompt=prompt, options=options):
+                if isinstance(msg, AssistantMessage):
+                    for block in msg.content:
+                        if isinstance(block, TextBlock):
+                            collected_text.append(block.text)
+                elif isinstance(msg, ResultMessage):
+                    if msg.is_error:
+                        logger.error(f"Summarization error: {msg.result}")
+                        return ""
 
         return "\n".join(collected_text)
     except Exception as e:
@@ -77,46 +103,36 @@ Write a concise summary (2-4 paragraphs) that captures the essential context."""
 async def compact_conversation(conversation_id: str) -> None:
     """Compact a conversation by summarizing older messages.
 
-    This runs asynchronously and updates the conversation's summary field.
+    This runs asynchronously and folds the oldest unsummarized messages into
+    the conversation's summary field.
     """
+    if conversation_id in _compacting:
+        return
+    _compacting.add(conversation_id)
     try:
         conversation = await db.get_conversation(conversation_id)
         if not conversation:
             logger.warning(f"Conversation {conversation_id} not found for compaction")
             return
 
-        # Check if compaction is needed
-        if conversation.message_count < COMPACTION_THRESHOLD:
+        # Get the oldest unsummarized messages, always leaving the most recent
+        # ones out of the summary
+        messages = await db.get_messages_for_compaction(
+            conversation_id, MESSAGES_TO_SUMMARIZE + RECENT_MESSAGES_TO_KEEP
+        )
+        messages_to_summarize = messages[:-RECENT_MESSAGES_TO_KEEP]
+        if not messages_to_summarize:
             return
 
         logger.info(
             f"Starting compaction for conversation {conversation_id} "
-            f"(message_count={conversation.message_count})"
+            f"(summarizing {len(messages_to_summarize)} messages)"
         )
 
-        # Get messages to summarize (oldest ones)
-        messages_to_summarize = await db.get_messages_for_compaction(
-            conversation_id, MESSAGES_TO_SUMMARIZE
-        )
-
-        if not messages_to_summarize:
-            return
-
-        # Include existing summary in new summary if present
-        existing_summary = conversation.summary or ""
-
-        if existing_summary:
-            # Append new messages to existing summary context
-            summary_prompt_messages = messages_to_summarize
-            existing_context = (
-                f"Previous summary:\n{existing_summary}\n\nNew messages to incorporate:"
-            )
-        else:
-            existing_context = ""
-            summary_prompt_messages = messages_to_summarize
-
         # Generate summary
-        new_summary = await summarize_messages(summary_prompt_messages)
+        new_summary = await summarize_messages(
+            messages_to_summarize, previous_summary=conversation.summary
+        )
 
         if not new_summary:
             logger.warning(
@@ -124,20 +140,12 @@ async def compact_conversation(conversation_id: str) -> None:
             )
             return
 
-        # Combine with existing summary if present
-        if existing_context:
-            final_summary = f"{existing_summary}\n\n{new_summary}"
-        else:
-            final_summary = new_summary
-
-        # Get the ID of the last summarized message
-        last_summarized = messages_to_summarize[-1]
-
         # Update conversation with new summary
         await db.update_conversation_summary(
             conversation_id=conversation_id,
-            summary=final_summary,
-            summarized_through_id=last_summarized.id,
+            summary=new_summary,
+            summarized_through_id=messages_to_summarize[-1].id,
+            newly_summarized=len(messages_to_summarize),
         )
 
         logger.info(
@@ -147,17 +155,25 @@ async def compact_conversation(conversation_id: str) -> None:
 
     except Exception as e:
         logger.error(f"Compaction failed for conversation {conversation_id}: {e}")
+    finally:
+        _compacting.discard(conversation_id)
 
 
-def trigger_compaction(conversation_id: str, message_count: int) -> None:
+def trigger_compaction(conversation_id: str, unsummarized_count: int) -> None:
     """Fire-and-forget trigger for compaction.
 
     Checks if compaction is needed and schedules it asynchronously.
     Does not block the calling code.
+
+    Args:
+        conversation_id: The conversation ID
+        unsummarized_count: Messages not yet covered by the summary (as
+            returned by db.create_message)
+
     """
-    if message_count < COMPACTION_THRESHOLD:
+    if unsummarized_count < COMPACTION_THRESHOLD or conversation_id in _compacting:
         return
 
     # Schedule compaction as a background task
-    asyncio.create_task(compact_conversation(conversation_id))
+    spawn_background(compact_conversation(conversation_id))
     logger.debug(f"Scheduled compaction for conversation {conversation_id}")
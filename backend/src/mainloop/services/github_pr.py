@@ -1,9 +1,11 @@
 """GitHub PR monitoring service."""
 
 import logging
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import Literal
+from typing import AsyncGenerator, Literal
 
+import httpx
 from githubkit import GitHub
 from mainloop.config import settings
 from pydantic import BaseModel
@@ -51,14 +53,54 @@ class PRStatus(BaseModel):
     review_decision: str | None  # APPROVED, CHANGES_REQUESTED, REVIEW_REQUIRED, etc.
 
 
+class _PooledGitHub(GitHub):
+    """GitHub client that sends every request over one HTTP client.
+
+    githubkit otherwise opens and closes an HTTP client per request (its
+    context-manager client is per-task), paying a TLS handshake each call.
+    """
+
+    _http_client: httpx.AsyncClient | None = None
+
+    @asynccontextmanager
+    async def get_async_client(self) -> AsyncGenerator[httpx.AsyncClient, None]:
+        if self._http_client is None:
+            self._http_client = self._create_async_client()
+        yield self._http_client
+
+    async def aclose(self):
+        """Close the shared HTTP client."""
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+
+
+_github: _PooledGitHub | None = None
+
+
 def _get_github() -> GitHub:
-    """Get a GitHub client instance.
+    """Get the shared GitHub client.
 
     Returns:
         GitHub client configured with the token from settings
 
     """
-    return GitHub(settings.github_token) if settings.github_token else GitHub()
+    global _github
+    if _github is None:
+        _github = (
+            _PooledGitHub(settings.github_token)
+            if settings.github_token
+            else _PooledGitHub()
+        )
+    return _github
+
+
+async def close_github():
+    """Close the shared GitHub client's connections."""
+    global _github
+    if _github is not None:
+        await _github.aclose()
+        _github = None
 
 
 def _parse_repo(repo_url: str) -> tuple[str, str]:
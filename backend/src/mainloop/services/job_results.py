@@ -0,0 +1,84 @@
+"""Batched storage of K8s job completion callbacks.
+
+Callbacks that arrive together (e.g. many jobs finishing at once) are written
+in one UPDATE instead of a lookup and an update per callback. Each caller
+still waits for its batch to commit, so a callback is only acknowledged once
+its result is stored.
+"""
+
+import asyncio
+import logging
+from typing import Any
+
+from mainloop.background import spawn_background
+from mainloop.db import db
+
+logger = logging.getLogger(__name__)
+
+# Flush as soon as this many tasks are waiting...
+MAX_BATCH_SIZE = 64
+# ...or once the oldest has waited this many seconds
+MAX_BATCH_DELAY = 0.02
+
+# task_id -> (merged fields, waiting callers)
+_pending: dict[str, tuple[dict[str, Any], list[asyncio.Future]]] = {}
+_batch_full = asyncio.Event()
+_flush_task: asyncio.Task | None = None
+
+
+async def record_job_result(task_id: str, **fields: Any) -> bool:
+    """Store a job result with the next batch.
+
+    Args:
+        task_id: The task ID
+        **fields: Task fields to set (see Database.record_job_results)
+
+    Returns:
+        Whether the task exists
+
+    """
+    global _flush_task
+
+    future = asyncio.get_running_loop().create_future()
+    merged, waiters = _pending.setdefault(task_id, ({}, []))
+    # Repeat callbacks for a task merge like sequential updates would
+    merged.update({k: v for k, v in fields.items() if v is not None})
+    waiters.append(future)
+
+    if _flush_task is None:
+        _flush_task = spawn_background(_flush())
+    if len(_pending) >= MAX_BATCH_SIZE:
+        _batch_full.set()
+
+    return await future
+
+
+async def _flush():
+    global _pending, _flush_task
+
+    try:
+        await asyncio.wait_for(_batch_full.wait(), MAX_BATCH_DELAY)
+    except TimeoutError:
+        pass
+
+    # Later callbacks start the next batch
+    batch, _pending = _pending, {}
+    _batch_full.clear()
+    _flush_task = None
+
+    try:
+        found = await db.record_job_results(
+            {task_id: fields for task_id, (fields, _) in batch.items()}
+        )
+    except Exception as e:
+        logger.error(f"Failed to store {len(batch)} job result(s): {e}")
+        for _, waiters in batch.values():
+            for future in waiters:
+                if not future.done():  # Caller may have disconnected
+                    future.set_exception(e)
+        return
+
+    for task_id, (_, waiters) in batch.items():
+        for future in waiters:
+            if not future.done():
+                future.set_result(task_id in found)
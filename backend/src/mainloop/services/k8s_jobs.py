@@ -1,9 +1,11 @@
 """Kubernetes Job management for worker tasks."""
 
+import asyncio
 import logging
+from collections.abc import AsyncIterator
 from typing import Literal
 
-from kubernetes import client
+from kubernetes import client, watch
 from kubernetes.client.rest import ApiException
 from mainloop.config import settings
 from mainloop.services.k8s_namespace import WORKER_SERVICE_ACCOUNT, get_k8s_client
@@ -59,21 +61,22 @@ async def create_worker_job(
 
     # Check if job already exists and is completed - delete it to allow retry
     try:
-        existing_job = batch_v1.read_namespaced_job(name=job_name, namespace=namespace)
+        existing_job = await asyncio.to_thread(
+            batch_v1.read_namespaced_job, name=job_name, namespace=namespace
+        )
         status = existing_job.status
         if (status.succeeded and status.succeeded > 0) or (
             status.failed and status.failed > 0
         ):
             # Job completed, delete it to allow re-creation
             logger.info(f"Deleting completed job {job_name} for retry")
-            batch_v1.delete_namespaced_job(
+            await asyncio.to_thread(
+                batch_v1.delete_namespaced_job,
                 name=job_name,
                 namespace=namespace,
                 body=client.V1DeleteOptions(propagation_policy="Background"),
             )
             # Brief wait for deletion to propagate
-            import asyncio
-
             await asyncio.sleep(1)
     except ApiException as e:
         if e.status != 404:
@@ -182,7 +185,9 @@ async def create_worker_job(
     )
 
     try:
-        batch_v1.create_namespaced_job(namespace=namespace, body=job)
+        await asyncio.to_thread(
+            batch_v1.create_namespaced_job, namespace=namespace, body=job
+        )
         logger.info(f"Created job {job_name} in namespace {namespace}")
     except ApiException as e:
         if e.status == 409:
@@ -207,7 +212,8 @@ async def get_job_status(task_id: str, namespace: str) -> dict | None:
     _, batch_v1 = get_k8s_client()
 
     try:
-        jobs = batch_v1.list_namespaced_job(
+        jobs = await asyncio.to_thread(
+            batch_v1.list_namespaced_job,
             namespace=namespace,
             label_selector=f"mainloop.dev/task-id={task_id}",
         )
@@ -215,19 +221,7 @@ async def get_job_status(task_id: str, namespace: str) -> dict | None:
         if not jobs.items:
             return None
 
-        job = jobs.items[0]
-        status = job.status
-
-        return {
-            "name": job.metadata.name,
-            "active": status.active or 0,
-            "succeeded": status.succeeded or 0,
-            "failed": status.failed or 0,
-            "start_time": status.start_time.isoformat() if status.start_time else None,
-            "completion_time": (
-                status.completion_time.isoformat() if status.completion_time else None
-            ),
-        }
+        return _job_status(jobs.items[0])
 
     except ApiException as e:
         if e.status == 404:
@@ -235,6 +229,61 @@ async def get_job_status(task_id: str, namespace: str) -> dict | None:
         raise
 
 
+async def watch_job_until_terminal(
+    task_id: str, namespace: str, timeout: int
+) -> AsyncIterator[dict]:
+    """Watch a worker Job and yield its status each time it changes.
+
+    Uses a single watch stream instead of polling get_job_status, so the
+    apiserver only sends events on transitions. Stops once the Job has
+    succeeded or failed, or when the timeout elapses.
+
+    Args:
+        task_id: The task ID
+        namespace: Namespace where the Job is running
+        timeout: Max seconds to watch
+
+    Yields:
+        Job status dicts (same shape as get_job_status)
+
+    """
+    _, batch_v1 = get_k8s_client()
+
+    w = watch.Watch()
+    stream = w.stream(
+        batch_v1.list_namespaced_job,
+        namespace=namespace,
+        label_selector=f"mainloop.dev/task-id={task_id}",
+        timeout_seconds=timeout,
+    )
+    last_status = None
+    try:
+        # The watch is blocking, so pull each event from a worker thread
+        while (event := await asyncio.to_thread(next, stream, None)) is not None:
+            status = _job_status(event["object"])
+            if status != last_status:
+                last_status = status
+                yield status
+            if status["succeeded"] or status["failed"]:
+                return
+    finally:
+        w.stop()
+
+
+def _job_status(job: client.V1Job) -> dict:
+    status = job.status
+    return {
+        "name": job.metadata.name,
+        "active": status.active or 0,
+        "succeeded": status.succeeded or 0,
+        "failed": status.failed or 0,
+        "start_time": status.start_time.isoformat() if status.start_time else None,
+        "completion_time": (
+            status.completion_time.isoformat() if status.completion_time else None
+        ),
+    }
+
+
 async def delete_job(task_id: str, namespace: str) -> None:
     """Delete a worker Job.
 
@@ -246,13 +295,15 @@ async def delete_job(task_id: str, namespace: str) -> None:
     _, batch_v1 = get_k8s_client()
 
     try:
-        jobs = batch_v1.list_namespaced_job(
+        jobs = await asyncio.to_thread(
+            batch_v1.list_namespaced_job,
             namespace=namespace,
             label_selector=f"mainloop.dev/task-id={task_id}",
         )
 
         for job in jobs.items:
-            batch_v1.delete_namespaced_job(
+            await asyncio.to_thread(
+                batch_v1.delete_namespaced_job,
                 name=job.metadata.name,
                 namespace=namespace,
                 body=client.V1DeleteOptions(
@@ -268,12 +319,16 @@ async def delete_job(task_id: str, namespace: str) -> None:
             raise
 
 
-async def get_job_logs(task_id: str, namespace: str) -> str | None:
+async def get_job_logs(
+    task_id: str, namespace: str, tail_lines: int | None = None
+) -> str | None:
     """Get logs from a worker Job's pod.
 
     Args:
         task_id: The task ID
         namespace: Namespace where the Job is running
+        tail_lines: Only return this many lines from the end (tailed by the
+            API server, so older logs aren't transferred)
 
     Returns:
         Pod logs as string or None if not found
@@ -282,7 +337,8 @@ async def get_job_logs(task_id: str, namespace: str) -> str | None:
     core_v1, _ = get_k8s_client()
 
     try:
-        pods = core_v1.list_namespaced_pod(
+        pods = await asyncio.to_thread(
+            core_v1.list_namespaced_pod,
             namespace=namespace,
             label_selector=f"mainloop.dev/task-id={task_id}",
         )
@@ -291,10 +347,12 @@ async def get_job_logs(task_id: str, namespace: str) -> str | None:
             return None
 
         pod = pods.items[0]
-        logs = core_v1.read_namespaced_pod_log(
+        logs = await asyncio.to_thread(
+            core_v1.read_namespaced_pod_log,
             name=pod.metadata.name,
             namespace=namespace,
             container="claude-agent",
+            tail_lines=tail_lines,
         )
 
         return logs
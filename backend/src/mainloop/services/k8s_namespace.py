@@ -1,9 +1,13 @@
 """Kubernetes namespace management for task isolation."""
 
+import asyncio
 import logging
+import threading
+from typing import Any, Callable
 
-from kubernetes import client, config
+from kubernetes import client, config, watch
 from kubernetes.client.rest import ApiException
+from mainloop.config import settings
 
 logger = logging.getLogger(__name__)
 
@@ -26,39 +30,98 @@ WORKER_SERVICE_ACCOUNT = "worker"
 WORKER_CLUSTER_ROLE = "mainloop-worker-role"
 
 
-def get_k8s_client() -> tuple[client.CoreV1Api, client.BatchV1Api]:
-    """Get Kubernetes API clients.
+# Max pooled connections to the API server (shared by all API clients)
+K8S_CONNECTION_POOL_SIZE = 64
+
+# Page size for cluster-scoped LIST requests
+LIST_PAGE_SIZE = 500
+
+# Singleton ApiClient shared by all helpers so config loading and TLS
+# handshakes happen once per process instead of once per call
+_api_client: client.ApiClient | None = None
+
 
-    Loads in-cluster config when running in K8s, falls back to kubeconfig for local dev.
+def get_api_client() -> client.ApiClient:
+    """Get the shared Kubernetes ApiClient.
+
+    Loads in-cluster config when running in K8s. For local dev, talks to a
+    `kubectl proxy` if KUBECTL_PROXY_URL is set, else falls back to kubeconfig.
     """
-    try:
-        config.load_incluster_config()
-        logger.info("Loaded in-cluster Kubernetes config")
-    except config.ConfigException:
-        config.load_kube_config()
-        logger.info("Loaded kubeconfig for local development")
+    global _api_client
+    if _api_client is None:
+        try:
+            config.load_incluster_config()
+            logger.info("Loaded in-cluster Kubernetes config")
+            configuration = client.Configuration.get_default_copy()
+        except config.ConfigException:
+            if settings.kubectl_proxy_url:
+                configuration = client.Configuration(host=settings.kubectl_proxy_url)
+                logger.info(f"Using kubectl proxy at {settings.kubectl_proxy_url}")
+            else:
+                config.load_kube_config()
+                logger.info("Loaded kubeconfig for local development")
+                configuration = client.Configuration.get_default_copy()
 
-    return client.CoreV1Api(), client.BatchV1Api()
+        configuration.connection_pool_maxsize = K8S_CONNECTION_POOL_SIZE
+        _api_client = client.ApiClient(configuration)
+    return _api_client
 
 
-def get_rbac_client() -> client.RbacAuthorizationV1Api:
-    """Get Kubernetes RBAC API client."""
-    try:
-        config.load_incluster_config()
-    except config.ConfigException:
-        config.load_kube_config()
+# Typed API wrappers around the shared ApiClient, built on first use
+_k8s_clients: tuple[client.CoreV1Api, client.BatchV1Api] | None = None
+
 
-    return client.RbacAuthorizationV1Api()
+def get_k8s_client() -> tuple[client.CoreV1Api, client.BatchV1Api]:
+    """Get the shared Kubernetes API clients."""
+    global _k8s_clients
+    if _k8s_clients is None:
+        api_client = get_api_client()
+        _k8s_clients = client.CoreV1Api(api_client), client.BatchV1Api(api_client)
+    return _k8s_clients
 
 
-def get_networking_client() -> client.NetworkingV1Api:
-    """Get Kubernetes Networking API client."""
-    try:
-        config.load_incluster_config()
-    except config.ConfigException:
-        config.load_kube_config()
+# Field manager name recorded on objects written via server-side apply
+FIELD_MANAGER = "mainloop"
 
-    return client.NetworkingV1Api()
+# Server-side apply endpoints by object kind
+_APPLY_PATHS = {
+    "Namespace": "/api/v1/namespaces/{name}",
+    "Secret": "/api/v1/namespaces/{namespace}/secrets/{name}",
+    "ServiceAccount": "/api/v1/namespaces/{namespace}/serviceaccounts/{name}",
+    "RoleBinding": "/apis/rbac.authorization.k8s.io/v1/namespaces/{namespace}/rolebindings/{name}",
+    "NetworkPolicy": "/apis/networking.k8s.io/v1/namespaces/{namespace}/networkpolicies/{name}",
+}
+
+
+async def apply_object(obj: Any) -> None:
+    """Create or update a Kubernetes object with server-side apply.
+
+    Apply is idempotent, so callers don't need create-then-handle-409 logic
+    and independent objects can be applied concurrently.
+
+    Args:
+        obj: Typed Kubernetes model with api_version, kind and metadata set
+
+    """
+    api_client = get_api_client()
+    path = _APPLY_PATHS[obj.kind].format(
+        name=obj.metadata.name, namespace=obj.metadata.namespace
+    )
+    await asyncio.to_thread(
+        api_client.call_api,
+        path,
+        "PATCH",
+        query_params=[("fieldManager", FIELD_MANAGER), ("force", "true")],
+        header_params={
+            "Content-Type": "application/apply-patch+yaml",
+            "Accept": "application/json",
+        },
+        # The REST layer JSON-encodes apply bodies (JSON is valid YAML)
+        body=api_client.sanitize_for_serialization(obj),
+        auth_settings=["BearerToken"],
+        _return_http_data_only=True,
+    )
+    logger.info(f"Applied {obj.kind} {obj.metadata.name}")
 
 
 async def create_task_namespace(task_id: str) -> str:
@@ -71,28 +134,21 @@ async def create_task_namespace(task_id: str) -> str:
         The namespace name that was created
 
     """
-    core_v1, _ = get_k8s_client()
     namespace_name = f"{TASK_NAMESPACE_PREFIX}{task_id[:8]}"
 
     namespace = client.V1Namespace(
+        api_version="v1",
+        kind="Namespace",
         metadata=client.V1ObjectMeta(
             name=namespace_name,
             labels={
                 "app.kubernetes.io/managed-by": "mainloop",
                 "mainloop.dev/task-id": task_id,
             },
-        )
+        ),
     )
 
-    try:
-        core_v1.create_namespace(body=namespace)
-        logger.info(f"Created namespace: {namespace_name}")
-    except ApiException as e:
-        if e.status == 409:
-            logger.info(f"Namespace {namespace_name} already exists")
-        else:
-            raise
-
+    await apply_object(namespace)
     return namespace_name
 
 
@@ -109,48 +165,52 @@ async def copy_secrets_to_namespace(
         secrets: List of secret names to copy (defaults to DEFAULT_SECRETS_TO_COPY)
 
     """
-    core_v1, _ = get_k8s_client()
     secrets_to_copy = secrets or DEFAULT_SECRETS_TO_COPY
 
-    for secret_name in secrets_to_copy:
-        try:
-            # Read secret from source namespace
-            source_secret = core_v1.read_namespaced_secret(
-                name=secret_name,
-                namespace=SOURCE_NAMESPACE,
-            )
+    await asyncio.gather(
+        *(
+            _copy_secret(task_id, namespace, secret_name)
+            for secret_name in secrets_to_copy
+        )
+    )
 
-            # Create new secret in target namespace
-            new_secret = client.V1Secret(
-                metadata=client.V1ObjectMeta(
-                    name=secret_name,
-                    namespace=namespace,
-                    labels={
-                        "app.kubernetes.io/managed-by": "mainloop",
-                        "mainloop.dev/task-id": task_id,
-                        "mainloop.dev/copied-from": SOURCE_NAMESPACE,
-                    },
-                ),
-                type=source_secret.type,
-                data=source_secret.data,
-            )
 
-            try:
-                core_v1.create_namespaced_secret(namespace=namespace, body=new_secret)
-                logger.info(f"Copied secret {secret_name} to namespace {namespace}")
-            except ApiException as e:
-                if e.status == 409:
-                    logger.info(f"Secret {secret_name} already exists in {namespace}")
-                else:
-                    raise
+async def _copy_secret(task_id: str, namespace: str, secret_name: str) -> None:
+    core_v1, _ = get_k8s_client()
 
-        except ApiException as e:
-            if e.status == 404:
-                logger.warning(
-                    f"Secret {secret_name} not found in {SOURCE_NAMESPACE}, skipping"
-                )
-            else:
-                raise
+    try:
+        # Read secret from source namespace
+        source_secret = await asyncio.to_thread(
+            core_v1.read_namespaced_secret,
+            name=secret_name,
+            namespace=SOURCE_NAMESPACE,
+        )
+    except ApiException as e:
+        if e.status == 404:
+            logger.warning(
+                f"Secret {secret_name} not found in {SOURCE_NAMESPACE}, skipping"
+            )
+            return
+        raise
+
+    # Apply a copy in the target namespace
+    await apply_object(
+        client.V1Secret(
+            api_version="v1",
+            kind="Secret",
+            metadata=client.V1ObjectMeta(
+                name=secret_name,
+                namespace=namespace,
+                labels={
+                    "app.kubernetes.io/managed-by": "mainloop",
+                    "mainloop.dev/task-id": task_id,
+                    "mainloop.dev/copied-from": SOURCE_NAMESPACE,
+                },
+            ),
+            type=source_secret.type,
+            data=source_secret.data,
+        )
+    )
 
 
 async def setup_worker_rbac(task_id: str, namespace: str) -> None:
@@ -163,11 +223,10 @@ async def setup_worker_rbac(task_id: str, namespace: str) -> None:
         namespace: Target namespace
 
     """
-    core_v1, _ = get_k8s_client()
-    rbac_v1 = get_rbac_client()
-
-    # Create worker ServiceAccount
+    # Worker ServiceAccount
     service_account = client.V1ServiceAccount(
+        api_version="v1",
+        kind="ServiceAccount",
         metadata=client.V1ObjectMeta(
             name=WORKER_SERVICE_ACCOUNT,
             namespace=namespace,
@@ -178,21 +237,10 @@ async def setup_worker_rbac(task_id: str, namespace: str) -> None:
         ),
     )
 
-    try:
-        core_v1.create_namespaced_service_account(
-            namespace=namespace, body=service_account
-        )
-        logger.info(f"Created ServiceAccount {WORKER_SERVICE_ACCOUNT} in {namespace}")
-    except ApiException as e:
-        if e.status == 409:
-            logger.info(
-                f"ServiceAccount {WORKER_SERVICE_ACCOUNT} already exists in {namespace}"
-            )
-        else:
-            raise
-
-    # Create RoleBinding to bind ClusterRole to ServiceAccount
+    # RoleBinding to bind ClusterRole to ServiceAccount
     role_binding = client.V1RoleBinding(
+        api_version="rbac.authorization.k8s.io/v1",
+        kind="RoleBinding",
         metadata=client.V1ObjectMeta(
             name="worker-role-binding",
             namespace=namespace,
@@ -215,14 +263,7 @@ async def setup_worker_rbac(task_id: str, namespace: str) -> None:
         ),
     )
 
-    try:
-        rbac_v1.create_namespaced_role_binding(namespace=namespace, body=role_binding)
-        logger.info(f"Created RoleBinding for {WORKER_SERVICE_ACCOUNT} in {namespace}")
-    except ApiException as e:
-        if e.status == 409:
-            logger.info(f"RoleBinding already exists in {namespace}")
-        else:
-            raise
+    await asyncio.gather(apply_object(service_account), apply_object(role_binding))
 
 
 async def apply_task_namespace_network_policies(task_id: str, namespace: str) -> None:
@@ -241,10 +282,10 @@ async def apply_task_namespace_network_policies(task_id: str, namespace: str) ->
         namespace: Target namespace
 
     """
-    networking_v1 = get_networking_client()
-
     # Default deny-all policy
     deny_all_policy = client.V1NetworkPolicy(
+        api_version="networking.k8s.io/v1",
+        kind="NetworkPolicy",
         metadata=client.V1ObjectMeta(
             name="default-deny-all",
             namespace=namespace,
@@ -261,6 +302,8 @@ async def apply_task_namespace_network_policies(task_id: str, namespace: str) ->
 
     # Allow DNS policy
     allow_dns_policy = client.V1NetworkPolicy(
+        api_version="networking.k8s.io/v1",
+        kind="NetworkPolicy",
         metadata=client.V1ObjectMeta(
             name="allow-dns",
             namespace=namespace,
@@ -291,6 +334,8 @@ async def apply_task_namespace_network_policies(task_id: str, namespace: str) ->
 
     # Allow internet-only egress (block cluster internal)
     allow_internet_policy = client.V1NetworkPolicy(
+        api_version="networking.k8s.io/v1",
+        kind="NetworkPolicy",
         metadata=client.V1ObjectMeta(
             name="allow-internet-only",
             namespace=namespace,
@@ -324,19 +369,12 @@ async def apply_task_namespace_network_policies(task_id: str, namespace: str) ->
     )
 
     # Apply policies
-    for policy in [deny_all_policy, allow_dns_policy, allow_internet_policy]:
-        try:
-            networking_v1.create_namespaced_network_policy(
-                namespace=namespace, body=policy
-            )
-            logger.info(f"Applied NetworkPolicy {policy.metadata.name} to {namespace}")
-        except ApiException as e:
-            if e.status == 409:
-                logger.info(
-                    f"NetworkPolicy {policy.metadata.name} already exists in {namespace}"
-                )
-            else:
-                raise
+    await asyncio.gather(
+        *(
+            apply_object(policy)
+            for policy in [deny_all_policy, allow_dns_policy, allow_internet_policy]
+        )
+    )
 
 
 async def delete_task_namespace(task_id: str) -> None:
@@ -350,7 +388,8 @@ async def delete_task_namespace(task_id: str) -> None:
     namespace_name = f"{TASK_NAMESPACE_PREFIX}{task_id[:8]}"
 
     try:
-        core_v1.delete_namespace(
+        await asyncio.to_thread(
+            core_v1.delete_namespace,
             name=namespace_name,
             body=client.V1DeleteOptions(
                 propagation_policy="Foreground",
@@ -374,11 +413,13 @@ async def namespace_exists(task_id: str) -> bool:
         True if namespace exists, False otherwise
 
     """
-    core_v1, _ = get_k8s_client()
     namespace_name = f"{TASK_NAMESPACE_PREFIX}{task_id[:8]}"
+    if _namespace_index.synced:
+        return _namespace_index.has(namespace_name)
 
+    core_v1, _ = get_k8s_client()
     try:
-        core_v1.read_namespace(name=namespace_name)
+        await asyncio.to_thread(core_v1.read_namespace, name=namespace_name)
         return True
     except ApiException as e:
         if e.status == 404:
@@ -386,6 +427,27 @@ async def namespace_exists(task_id: str) -> bool:
         raise
 
 
+async def list_task_jobs(task_id: str) -> list[str]:
+    """List the names of the Jobs in a task namespace.
+
+    Args:
+        task_id: The task ID
+
+    Returns:
+        Job names (empty if the namespace doesn't exist)
+
+    """
+    namespace_name = f"{TASK_NAMESPACE_PREFIX}{task_id[:8]}"
+    if _job_index.synced:
+        return _job_index.names(namespace_name)
+
+    _, batch_v1 = get_k8s_client()
+    jobs = await asyncio.to_thread(
+        batch_v1.list_namespaced_job, namespace=namespace_name
+    )
+    return [job.metadata.name for job in jobs.items]
+
+
 async def list_task_namespaces() -> list[str]:
     """List all task namespaces managed by mainloop.
 
@@ -395,8 +457,170 @@ async def list_task_namespaces() -> list[str]:
     """
     core_v1, _ = get_k8s_client()
 
-    namespaces = core_v1.list_namespace(
-        label_selector="app.kubernetes.io/managed-by=mainloop"
-    )
+    # Page through the cluster-scoped LIST so large clusters don't hit
+    # apiserver timeouts on a single huge response
+    names: list[str] = []
+    kwargs: dict = {
+        "label_selector": "app.kubernetes.io/managed-by=mainloop",
+        "limit": LIST_PAGE_SIZE,
+    }
+    while True:
+        namespaces = await asyncio.to_thread(core_v1.list_namespace, **kwargs)
+        names.extend(ns.metadata.name for ns in namespaces.items)
+        if not namespaces.metadata._continue:
+            return names
+        kwargs["_continue"] = namespaces.metadata._continue
+
+
+# ============= Informers =============
+
+# Seconds each watch request stays open before it is renewed
+WATCH_TIMEOUT = 300
+
+# Seconds to wait before listing again after a watch fails
+WATCH_RETRY_DELAY = 30
+
+
+class ResourceIndex:
+    """Names of one kind of K8s object, kept current by a list + watch loop.
+
+    The blocking watch runs in a daemon thread. Lookups should only be served
+    from the index while it is synced, i.e. after the first list completed
+    and while the watch is healthy; callers fall back to the API otherwise.
+    """
+
+    def __init__(
+        self,
+        kind: str,
+        get_list_func: Callable[[], Callable[..., Any]],
+        label_selector: str | None = None,
+    ):
+        self.kind = kind
+        # Resolved in the watch thread, so a missing kubeconfig doesn't
+        # fail startup. Must return the generated API method itself: the
+        # watch reads its docstring to deserialize events.
+        self._get_list_func = get_list_func
+        self._label_selector = label_selector
+        # namespace ("" for cluster-scoped objects) -> object names
+        self._names: dict[str, set[str]] = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self.synced = False
+
+    def start(self) -> None:
+        """Start syncing in the background."""
+        threading.Thread(
+            target=self._run, name=f"{self.kind}-informer", daemon=True
+        ).start()
+
+    def stop(self) -> None:
+        """Stop syncing (takes effect by the end of the current watch)."""
+        self._stopped.set()
+        self.synced = False
+
+    def has(self, name: str, namespace: str = "") -> bool:
+        """Check if an object is in the index."""
+        with self._lock:
+            return name in self._names.get(namespace, ())
+
+    def names(self, namespace: str = "") -> list[str]:
+        """List the names of the indexed objects in a namespace."""
+        with self._lock:
+            return sorted(self._names.get(namespace, ()))
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                self._list_and_watch()
+            except Exception as e:
+                self.synced = False
+                logger.warning(
+                    f"{self.kind} informer failed, retrying in "
+                    f"{WATCH_RETRY_DELAY}s: {e}"
+                )
+                self._stopped.wait(WATCH_RETRY_DELAY)
+
+    def _list_and_watch(self) -> None:
+        list_func = self._get_list_func()
+
+        # Page through the initial LIST, as list_task_namespaces does
+        names: dict[str, set[str]] = {}
+        kwargs: dict = {"limit": LIST_PAGE_SIZE}
+        if self._label_selector:
+            kwargs["label_selector"] = self._label_selector
+        while True:
+            page = list_func(**kwargs)
+            for obj in page.items:
+                names.setdefault(obj.metadata.namespace or "", set()).add(
+                    obj.metadata.name
+                )
+            if not page.metadata._continue:
+                break
+            kwargs["_continue"] = page.metadata._continue
+
+        with self._lock:
+            self._names = names
+        self.synced = True
+        logger.info(f"{self.kind} informer synced")
+
+        kwargs.pop("limit")
+        kwargs.pop("_continue", None)
+        resource_version = page.metadata.resource_version
+        while not self._stopped.is_set():
+            w = watch.Watch()
+            try:
+                for event in w.stream(
+                    list_func,
+                    resource_version=resource_version,
+                    timeout_seconds=WATCH_TIMEOUT,
+                    **kwargs,
+                ):
+                    self._apply(event["type"], event["object"])
+                    if self._stopped.is_set():
+                        break
+            except ApiException as e:
+                if e.status == 410:
+                    # Our resource version is too old to resume from
+                    logger.info(f"{self.kind} watch expired, listing again")
+                    return
+                raise
+            finally:
+                w.stop()
+            resource_version = w.resource_version or resource_version
+
+    def _apply(self, event_type: str, obj: Any) -> None:
+        namespace = obj.metadata.namespace or ""
+        with self._lock:
+            if event_type == "DELETED":
+                names = self._names.get(namespace)
+                if names:
+                    names.discard(obj.metadata.name)
+                    if not names:
+                        del self._names[namespace]
+            else:
+                self._names.setdefault(namespace, set()).add(obj.metadata.name)
+
+
+# Task namespaces, and Jobs in all namespaces (looked up per task namespace)
+_namespace_index = ResourceIndex(
+    "namespace",
+    lambda: get_k8s_client()[0].list_namespace,
+    label_selector="app.kubernetes.io/managed-by=mainloop",
+)
+_job_index = ResourceIndex(
+    "job",
+    lambda: get_k8s_client()[1].list_job_for_all_namespaces,
+    label_selector="app.kubernetes.io/managed-by=mainloop",
+)
+
+
+def start_informers() -> None:
+    """Start keeping the namespace and Job indexes in sync."""
+    _namespace_index.start()
+    _job_index.start()
+
 
-    return [ns.metadata.name for ns in namespaces.items]
+def stop_informers() -> None:
+    """Stop the namespace and Job informers."""
+    _namespace_index.stop()
+    _job_index.stop()
@@ -1,7 +1,6 @@
 """Server-Sent Events support for real-time updates."""
 
 import asyncio
-import json
 import logging
 import uuid
 from collections import defaultdict
@@ -10,8 +9,9 @@ from datetime import datetime
 from enum import Enum
 from typing import Any, AsyncGenerator
 
-from fastapi import Request
-from fastapi.responses import StreamingResponse
+import orjson
+from mainloop.background import spawn_background
+from sse_starlette import EventSourceResponse, ServerSentEvent
 
 logger = logging.getLogger(__name__)
 
@@ -38,15 +38,85 @@ class SSEEvent:
     data: dict[str, Any]
     id: str = field(default_factory=lambda: str(uuid.uuid4())[:8])
 
-    def encode(self) -> str:
-        """Encode as SSE format."""
-        lines = [
-            f"id: {self.id}",
-            f"event: {self.event}",
-            f"data: {json.dumps(self.data)}",
-            "",  # Empty line to end the event
-        ]
-        return "\n".join(lines) + "\n"
+    def to_sse(self) -> ServerSentEvent:
+        """Convert to a ServerSentEvent for EventSourceResponse to frame."""
+        return ServerSentEvent(
+            data=orjson.dumps(self.data).decode(), event=self.event, id=self.id
+        )
+
+
+# Task statuses after which no further updates are expected
+TERMINAL_STATUSES = ("completed", "failed", "cancelled")
+
+
+class TaskLogPoller:
+    """Polls K8s logs and status for one task on behalf of all its subscribers.
+
+    One poller runs per task no matter how many clients are streaming it, so
+    K8s and database load doesn't grow with the number of open log viewers.
+    """
+
+    def __init__(self, task_id: str, poll_interval: int = 2):
+        self.task_id = task_id
+        self.poll_interval = poll_interval
+        # Logs seen so far, replayed to subscribers that join mid-stream
+        self.logs = ""
+        self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        """Stop polling."""
+        self._task.cancel()
+
+    async def _run(self):
+        from mainloop.db import db
+        from mainloop.services.k8s_jobs import get_job_logs
+
+        namespace = f"task-{self.task_id[:8]}"
+
+        while True:
+            # Poll for new logs
+            try:
+                logs = await get_job_logs(self.task_id, namespace)
+                if logs and len(logs) > len(self.logs):
+                    # Publish before recording, so a client subscribing in
+                    # between gets the chunk once (from the queue, not replay)
+                    await event_bus.publish_to_task(
+                        self.task_id,
+                        SSEEvent(
+                            event=EventType.LOG,
+                            data={
+                                "logs": logs[len(self.logs) :],
+                                "task_id": self.task_id,
+                            },
+                        ),
+                    )
+                    self.logs = logs
+            except Exception as e:
+                logger.debug(f"Failed to get logs for task {self.task_id}: {e}")
+
+            # Check task status (a failed check is retried next poll, since
+            # every subscriber of the task depends on this loop)
+            try:
+                task = await db.get_worker_task(self.task_id)
+            except Exception as e:
+                logger.warning(f"Failed to get status for task {self.task_id}: {e}")
+                task = None
+            if task and task.status.value in TERMINAL_STATUSES:
+                await event_bus.publish_to_task(
+                    self.task_id,
+                    SSEEvent(
+                        event=EventType.STATUS,
+                        data={"status": task.status.value, "task_id": self.task_id},
+                    ),
+                )
+                await event_bus.publish_to_task(
+                    self.task_id,
+                    SSEEvent(event=EventType.END, data={"task_id": self.task_id}),
+                )
+                await event_bus.remove_task_poller(self.task_id, self)
+                return
+
+            await asyncio.sleep(self.poll_interval)
 
 
 class EventBus:
@@ -60,6 +130,8 @@ class EventBus:
         self._user_queues: dict[str, list[asyncio.Queue]] = defaultdict(list)
         # task_id -> list of queues (for log streaming)
         self._task_queues: dict[str, list[asyncio.Queue]] = defaultdict(list)
+        # task_id -> shared log poller (runs while the task has subscribers)
+        self._task_pollers: dict[str, TaskLogPoller] = {}
         self._lock = asyncio.Lock()
 
     async def subscribe_user(self, user_id: str) -> asyncio.Queue:
@@ -82,26 +154,49 @@ class EventBus:
                     pass
         logger.info(f"User {user_id} unsubscribed from events")
 
-    async def subscribe_task(self, task_id: str) -> asyncio.Queue:
-        """Subscribe to events for a task (log streaming)."""
+    async def subscribe_task(self, task_id: str) -> tuple[asyncio.Queue, str]:
+        """Subscribe to events for a task (log streaming).
+
+        Starts the task's log poller if this is the first subscriber.
+
+        Returns:
+            The event queue and the logs polled before subscribing
+
+        """
         queue: asyncio.Queue = asyncio.Queue()
         async with self._lock:
             self._task_queues[task_id].append(queue)
+            poller = self._task_pollers.get(task_id)
+            if poller is None:
+                poller = self._task_pollers[task_id] = TaskLogPoller(task_id)
+            backlog = poller.logs
         logger.info(f"Subscribed to task {task_id} logs")
-        return queue
+        return queue, backlog
 
     async def unsubscribe_task(self, task_id: str, queue: asyncio.Queue):
-        """Unsubscribe from task events."""
+        """Unsubscribe from task events.
+
+        Stops the task's log poller once its last subscriber leaves.
+        """
         async with self._lock:
             if task_id in self._task_queues:
                 try:
                     self._task_queues[task_id].remove(queue)
                     if not self._task_queues[task_id]:
                         del self._task_queues[task_id]
+                        poller = self._task_pollers.pop(task_id, None)
+                        if poller:
+                            poller.stop()
                 except ValueError:
                     pass
         logger.info(f"Unsubscribed from task {task_id} logs")
 
+    async def remove_task_poller(self, task_id: str, poller: TaskLogPoller):
+        """Forget a poller that finished on its own."""
+        async with self._lock:
+            if self._task_pollers.get(task_id) is poller:
+                del self._task_pollers[task_id]
+
     async def publish_to_user(self, user_id: str, event: SSEEvent):
         """Publish an event to all subscribers for a user."""
         async with self._lock:
@@ -112,6 +207,16 @@ class EventBus:
                 except asyncio.QueueFull:
                     logger.warning(f"Queue full for user {user_id}, dropping event")
 
+    async def publish_to_all_users(self, event: SSEEvent):
+        """Publish an event to every user's subscribers."""
+        async with self._lock:
+            for user_id, queues in self._user_queues.items():
+                for queue in queues:
+                    try:
+                        queue.put_nowait(event)
+                    except asyncio.QueueFull:
+                        logger.warning(f"Queue full for user {user_id}, dropping event")
+
     async def publish_to_task(self, task_id: str, event: SSEEvent):
         """Publish an event to all subscribers for a task."""
         async with self._lock:
@@ -127,14 +232,11 @@ class EventBus:
 event_bus = EventBus()
 
 
-async def event_stream(
-    user_id: str,
-    request: Request,
-    heartbeat_interval: int = 30,
-) -> AsyncGenerator[str, None]:
+async def event_stream(user_id: str) -> AsyncGenerator[ServerSentEvent, None]:
     """Generate SSE events for a user.
 
-    Sends heartbeat pings every heartbeat_interval seconds to keep connection alive.
+    Blocks on the subscriber queue, so events are sent as soon as they are
+    published. Heartbeats are sent by the response (see create_sse_response).
     """
     queue = await event_bus.subscribe_user(user_id)
 
@@ -143,26 +245,11 @@ async def event_stream(
         yield SSEEvent(
             event="connected",
             data={"user_id": user_id, "timestamp": datetime.utcnow().isoformat()},
-        ).encode()
+        ).to_sse()
 
         while True:
-            # Check if client disconnected
-            if await request.is_disconnected():
-                break
-
-            try:
-                # Wait for event with timeout for heartbeat
-                event = await asyncio.wait_for(
-                    queue.get(),
-                    timeout=heartbeat_interval,
-                )
-                yield event.encode()
-            except asyncio.TimeoutError:
-                # Send heartbeat
-                yield SSEEvent(
-                    event=EventType.HEARTBEAT,
-                    data={"timestamp": datetime.utcnow().isoformat()},
-                ).encode()
+            event = await queue.get()
+            yield event.to_sse()
     finally:
         await event_bus.unsubscribe_user(user_id, queue)
 
@@ -170,20 +257,15 @@ async def event_stream(
 async def task_log_stream(
     task_id: str,
     user_id: str,
-    request: Request,
-    poll_interval: int = 2,
-) -> AsyncGenerator[str, None]:
+) -> AsyncGenerator[ServerSentEvent, None]:
     """Generate SSE events for task logs.
 
-    Polls K8s logs and streams them to the client.
-    Also listens for task status changes.
+    Streams log and status events from the task's shared log poller,
+    starting with any logs it has already collected.
     """
     from mainloop.db import db
-    from mainloop.services.k8s_jobs import get_job_logs
 
-    queue = await event_bus.subscribe_task(task_id)
-    last_log_length = 0
-    namespace = f"task-{task_id[:8]}"
+    queue, backlog = await event_bus.subscribe_task(task_id)
 
     try:
         # Send initial status
@@ -192,68 +274,121 @@ async def task_log_stream(
             yield SSEEvent(
                 event=EventType.STATUS,
                 data={"status": task.status.value, "task_id": task_id},
-            ).encode()
+            ).to_sse()
+
+        if backlog:
+            yield SSEEvent(
+                event=EventType.LOG,
+                data={"logs": backlog, "task_id": task_id},
+            ).to_sse()
 
         while True:
-            if await request.is_disconnected():
+            event = await queue.get()
+            yield event.to_sse()
+            if event.event == EventType.END:
                 break
+    finally:
+        await event_bus.unsubscribe_task(task_id, queue)
 
-            # Check for queued events first (status changes from event bus)
-            try:
-                event = queue.get_nowait()
-                yield event.encode()
-                if event.event == EventType.END:
-                    break
-            except asyncio.QueueEmpty:
-                pass
 
-            # Poll for new logs
-            try:
-                logs = await get_job_logs(task_id, namespace)
-                if logs and len(logs) > last_log_length:
-                    new_logs = logs[last_log_length:]
-                    last_log_length = len(logs)
-                    yield SSEEvent(
-                        event=EventType.LOG,
-                        data={"logs": new_logs, "task_id": task_id},
-                    ).encode()
-            except Exception as e:
-                logger.debug(f"Failed to get logs for task {task_id}: {e}")
-
-            # Check task status
-            task = await db.get_worker_task(task_id)
-            if task and task.status.value in ("completed", "failed", "cancelled"):
-                yield SSEEvent(
-                    event=EventType.STATUS,
-                    data={"status": task.status.value, "task_id": task_id},
-                ).encode()
-                yield SSEEvent(
-                    event=EventType.END,
-                    data={"task_id": task_id},
-                ).encode()
-                break
+async def task_status_stream(
+    task_id: str,
+    user_id: str,
+) -> AsyncGenerator[ServerSentEvent, None]:
+    """Generate SSE events for a task's status transitions.
+
+    Sends the current status, then each change pushed from the database,
+    ending once the task reaches a terminal status.
+    """
+    from mainloop.db import db
+
+    queue = await event_bus.subscribe_user(user_id)
+
+    try:
+        task = await db.get_worker_task(task_id)
+        status = task.status.value if task else None
+        if status:
+            yield SSEEvent(
+                event=EventType.STATUS,
+                data={"status": status, "task_id": task_id},
+            ).to_sse()
+
+        while status and status not in TERMINAL_STATUSES:
+            event = await queue.get()
+            if event.event != EventType.TASK_UPDATED:
+                continue
+            if "task_id" not in event.data:
+                # Updates may have been missed (see resync_task_updates)
+                task = await db.get_worker_task(task_id)
+                if not task or task.status.value == status:
+                    continue
+                status = task.status.value
+            elif event.data["task_id"] == task_id:
+                status = event.data["status"]
+            else:
+                continue
+            yield SSEEvent(
+                event=EventType.STATUS,
+                data={"status": status, "task_id": task_id},
+            ).to_sse()
 
-            await asyncio.sleep(poll_interval)
+        yield SSEEvent(event=EventType.END, data={"task_id": task_id}).to_sse()
     finally:
-        await event_bus.unsubscribe_task(task_id, queue)
+        await event_bus.unsubscribe_user(user_id, queue)
+
+
+# Seconds between heartbeat events on idle streams
+HEARTBEAT_INTERVAL = 30
 
 
-def create_sse_response(generator: AsyncGenerator[str, None]) -> StreamingResponse:
-    """Create an SSE StreamingResponse."""
-    return StreamingResponse(
+def _heartbeat() -> ServerSentEvent:
+    return SSEEvent(
+        event=EventType.HEARTBEAT,
+        data={"timestamp": datetime.utcnow().isoformat()},
+    ).to_sse()
+
+
+def create_sse_response(
+    generator: AsyncGenerator[ServerSentEvent, None],
+) -> EventSourceResponse:
+    """Create an SSE response.
+
+    EventSourceResponse handles event framing, sends heartbeat events while a
+    stream is idle, and cancels the generator when the client disconnects, so
+    streams don't need to poll for disconnects or time out their waits. It
+    also sets the no-cache, keep-alive and proxy no-buffering headers.
+    """
+    return EventSourceResponse(
         generator,
-        media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "X-Accel-Buffering": "no",  # Disable nginx buffering
-        },
+        ping=HEARTBEAT_INTERVAL,
+        ping_message_factory=_heartbeat,
     )
 
 
 # Helper functions to publish events from other parts of the app
 
 
+def dispatch_task_update(update: dict):
+    """Forward a task status change published by the database to SSE clients.
+
+    Used as the callback for Database.listen_task_updates.
+    """
+    spawn_background(
+        notify_task_updated(update["user_id"], update["id"], update["status"])
+    )
+
+
+def resync_task_updates():
+    """Tell every client to refetch its tasks after updates may have been missed.
+
+    Used as the reconnect callback for Database.listen_task_updates. The
+    event has no task_id, so clients refetch instead of patching one task.
+    """
+    spawn_background(
+        event_bus.publish_to_all_users(SSEEvent(event=EventType.TASK_UPDATED, data={}))
+    )
+
+
 async def notify_task_updated(user_id: str, task_id: str, status: str, **extra):
     """Notify user that a task was updated."""
     await event_bus.publish_to_user(
@@ -290,3 +425,35 @@ async def notify_inbox_updated(
             data=data,
         ),
     )
+
+
+# Seconds to wait for further inbox changes before pushing the unread count
+INBOX_REFRESH_DELAY = 0.05
+
+# user_id -> pending inbox refresh
+_inbox_refreshes: dict[str, asyncio.Task] = {}
+
+
+def schedule_inbox_refresh(user_id: str, item_id: str | None = None):
+    """Push the user's unread count to SSE clients after a short debounce.
+
+    Rapid inbox changes (e.g. clicking through items) collapse into one
+    count query and one event, carrying the latest item_id.
+    """
+    pending = _inbox_refreshes.get(user_id)
+    if pending:
+        pending.cancel()
+    _inbox_refreshes[user_id] = spawn_background(_refresh_inbox(user_id, item_id))
+
+
+async def _refresh_inbox(user_id: str, item_id: str | None):
+    from mainloop.db import db
+
+    await asyncio.sleep(INBOX_REFRESH_DELAY)
+
+    # Past the debounce window: later changes schedule their own refresh
+    if _inbox_refreshes.get(user_id) is asyncio.current_task():
+        del _inbox_refreshes[user_id]
+
+    unread_count = await db.count_unread_queue_items(user_id)
+    await notify_inbox_updated(user_id, item_id=item_id, unread_count=unread_count)
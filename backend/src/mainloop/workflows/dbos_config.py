@@ -17,6 +17,7 @@ dbos_config: DBOSConfig = {
     "system_database_url": settings.database_url
     or os.environ.get("DBOS_SYSTEM_DATABASE_URL"),
     "application_version": WORKFLOW_VERSION,
+    "sys_db_pool_size": settings.dbos_pool_size,
 }
 
 # Initialize DBOS - must be done before defining workflows
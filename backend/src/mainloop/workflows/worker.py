@@ -1,5 +1,6 @@
 """Worker task workflow - executes tasks in isolated K8s namespaces with PR feedback loop."""
 
+import asyncio
 import logging
 from datetime import datetime, timezone
 from typing import Any
@@ -185,9 +186,12 @@ async def update_worker_task_status(
 async def setup_namespace(task_id: str) -> str:
     """Create namespace, copy secrets, set up worker RBAC, and apply network policies."""
     namespace = await create_task_namespace(task_id)
-    await copy_secrets_to_namespace(task_id, namespace)
-    await setup_worker_rbac(task_id, namespace)
-    await apply_task_namespace_network_policies(task_id, namespace)
+    # Everything else only depends on the namespace existing
+    await asyncio.gather(
+        copy_secrets_to_namespace(task_id, namespace),
+        setup_worker_rbac(task_id, namespace),
+        apply_task_namespace_network_policies(task_id, namespace),
+    )
     return namespace
 
 